@@ -0,0 +1,32 @@
+"""Add files indexes
+
+Revision ID: c5e2b8d4f1a6
+Revises: a3c1f7e9b5d2
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c5e2b8d4f1a6"
+down_revision = "a3c1f7e9b5d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("files", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_files_type_datetime", ["type", "datetime", "id"], unique=False
+        )
+        batch_op.create_index("ix_files_datetime", ["datetime", "id"], unique=False)
+        batch_op.create_index("ix_files_locked", ["locked"], unique=False)
+    op.execute("ANALYZE files")
+
+
+def downgrade():
+    with op.batch_alter_table("files", schema=None) as batch_op:
+        batch_op.drop_index("ix_files_locked")
+        batch_op.drop_index("ix_files_datetime")
+        batch_op.drop_index("ix_files_type_datetime")
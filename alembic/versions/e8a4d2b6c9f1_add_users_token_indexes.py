@@ -0,0 +1,27 @@
+"""Add users token indexes
+
+Revision ID: e8a4d2b6c9f1
+Revises: c5e2b8d4f1a6
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e8a4d2b6c9f1"
+down_revision = "c5e2b8d4f1a6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.create_index("ix_users_cam_token", ["cam_token"], unique=False)
+        batch_op.create_index("ix_users_api_token", ["api_token"], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table("users", schema=None) as batch_op:
+        batch_op.drop_index("ix_users_api_token")
+        batch_op.drop_index("ix_users_cam_token")
@@ -1,16 +1,25 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, HTTPException, Security, status
+from fastapi import (
+    Depends,
+    HTTPException,
+    Security,
+    WebSocket,
+    WebSocketException,
+    status,
+)
 from fastapi.security import APIKeyCookie, APIKeyQuery, HTTPBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy import event
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import config
-from app.core.db import engine
-from app.core.security import ALGORITHM
+from app.core.db import ThreadSession, engine, get_async_engine
+from app.core.security import ALGORITHM, auth_cache
 from app.models import TokenPayload, User
 
 
@@ -40,6 +49,39 @@ def get_db() -> Generator[Session, None, None]:
 SessionDep = Annotated[Session, Depends(get_db)]
 
 
+async def async_get_or_404(self, Table, id, *, error_desc: str | None = None):
+    """Get by id or return 404"""
+    item = (await self.exec(select(Table).filter_by(id=id))).first()
+    if item is None:
+        raise HTTPException(404, error_desc)
+    return item
+
+
+async def async_get_all(self, Table, *, error_desc: str | None = None):
+    """Get all or return 404"""
+    item = (await self.exec(select(Table))).all()
+    if item is None:
+        raise HTTPException(404, error_desc)
+    return item
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Yield an async session, a threadpool backed one if async is disabled."""
+    if config.SQLALCHEMY_ASYNC:
+        AsyncSession.get_or_404 = async_get_or_404
+        AsyncSession.get_all = async_get_all
+        async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+            yield session
+    else:
+        ThreadSession.get_or_404 = async_get_or_404
+        ThreadSession.get_all = async_get_all
+        with Session(engine) as session:
+            yield ThreadSession(session)
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
 async def protected(
     key_result=Depends(APIKeyCookie(name="x-api-key", auto_error=False)),
     jwt_result=Depends(HTTPBearer(auto_error=False)),
@@ -47,7 +89,8 @@ async def protected(
     if not (key_result or jwt_result):
         raise HTTPException(status_code=403, detail="Not authenticated")
 
-    return key_result or jwt_result
+    # Token string, Bearer auth yields credentials
+    return key_result or jwt_result.credentials
 
 
 TokenDep = Annotated[str, Security(protected)]
@@ -61,17 +104,22 @@ async def cam_protected(
     if not (cam_result or key_result or jwt_result):
         raise HTTPException(status_code=403, detail="Not authenticated")
 
-    return cam_result or key_result or jwt_result
+    return cam_result or key_result or jwt_result.credentials
 
 
 CamTokenDep = Annotated[str, Security(cam_protected)]
 
 
 def get_camera_token(session: SessionDep, cam_protected: CamTokenDep) -> User:
-    user = session.exec(select(User).filter(User.cam_token == cam_protected)).first()
-    if user:
-        return user
-    user = get_current_user(session, cam_protected)
+    if (data := auth_cache.get_token(cam_protected)) is None:
+        user = session.exec(
+            select(User).filter(User.cam_token == cam_protected)
+        ).first()
+        if not user:
+            return get_current_user(session, cam_protected)
+        data = user.model_dump()
+        auth_cache.put(data, cam_protected)
+    return User(**data)
 
 
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
@@ -83,17 +131,46 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    if not user.enabled:
+    if (data := auth_cache.get(token_data.id)) is None:
+        user = session.get(User, token_data.id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        data = user.model_dump()
+        auth_cache.put(data)
+    if not data["enabled"]:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return user
+    return User(**data)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_user(mapper, connection, target: User) -> None:
+    """Drop cached auth state of a changed user.
+
+    Bulk update() and delete() statements skip mapper events, callers
+    must clear auth_cache themselves (as the settings restore does).
+    """
+    auth_cache.invalidate(target.id)
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+def get_websocket_user(websocket: WebSocket) -> User:
+    """Authenticate websocket with cookie or token query parameter."""
+    token = websocket.cookies.get("x-api-key") or websocket.query_params.get("token")
+    if not token:
+        raise WebSocketException(status.WS_1008_POLICY_VIOLATION, "Not authenticated")
+    with Session(engine) as session:
+        try:
+            return get_current_user(session, token)
+        except HTTPException as error:
+            raise WebSocketException(status.WS_1008_POLICY_VIOLATION, error.detail)
+
+
+WebSocketUser = Annotated[User, Depends(get_websocket_user)]
+
+
 def get_current_active_superuser(current_user: CurrentUser) -> User:
     if not current_user.right == 8:
         raise HTTPException(
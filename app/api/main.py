@@ -5,10 +5,13 @@ from app.api.routes import (
     authorize,
     buttons,
     camera,
+    jobs,
     logs,
+    metrics,
     motion,
     multiview,
     previews,
+    profiling,
     raspiconfig,
     rsync,
     schedule,
@@ -34,12 +37,24 @@ api_router.include_router(
     tags=["camera"],
     dependencies=[Security(get_camera_token)],
 )
+api_router.include_router(
+    jobs.router,
+    prefix="/jobs",
+    tags=["jobs"],
+    dependencies=[Security(get_current_user)],
+)
 api_router.include_router(
     logs.router,
     prefix="/logs",
     tags=["logs"],
     dependencies=[Security(get_current_user)],
 )
+api_router.include_router(
+    metrics.router,
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Security(get_camera_token)],
+)
 api_router.include_router(
     motion.router,
     prefix="/motion",
@@ -58,6 +73,12 @@ api_router.include_router(
     tags=["previews"],
     dependencies=[Security(get_current_user)],
 )
+api_router.include_router(
+    profiling.router,
+    prefix="/debug",
+    tags=["debug"],
+    dependencies=[Security(get_current_user)],
+)
 api_router.include_router(
     raspiconfig.router,
     prefix="/raspiconfig",
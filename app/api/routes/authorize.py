@@ -16,12 +16,13 @@ from pyotp import TOTP
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 
-from app.api.depends import CheckSuperUser, CurrentUser, SessionDep
+from app.api.depends import AsyncSessionDep, CheckSuperUser, CurrentUser
 from app.core.config import config
 from app.core.security import (
+    async_hash_password,
+    async_verify_password,
     create_access_token,
-    hash_password,
-    verify_password,
+    needs_rehash,
 )
 from app.models import CameraToken, Login, Register, TokenInfo, User, UserPublic
 
@@ -55,16 +56,21 @@ already_exists = HTTPException(
 
 @router.post("/authorize", status_code=200)
 async def authorize(
-    session: SessionDep, login: Login, response: Response, request: Request
+    session: AsyncSessionDep, login: Login, response: Response, request: Request
 ) -> TokenInfo | None:
-    user = session.exec(select(User).filter_by(name=login.username)).first()
+    user = (await session.exec(select(User).filter_by(name=login.username))).first()
 
     if user is None or user.enabled is False:
         raise authorize_exception
 
-    if verify_password(login.password, user.secret) is False:
+    if await async_verify_password(login.password, user.secret) is False:
         raise authorize_exception
 
+    if needs_rehash(user.secret):
+        user.secret = await async_hash_password(login.password)
+        session.add(user)
+        await session.commit()
+
     if user.otp_confirmed and login.otp_code is None:
         response.status_code = 202
         return
@@ -99,7 +105,7 @@ async def read_users_me(current_user: CurrentUser) -> UserPublic:
 
 @router.get("/firstenrollment", status_code=204)
 async def check_first_run(
-    session: SessionDep, exists: CheckSuperUser, response: Response
+    session: AsyncSessionDep, exists: CheckSuperUser, response: Response
 ):
     if exists:
         response.status_code = 202
@@ -113,7 +119,7 @@ async def health_check():
 
 @router.post("/register", status_code=204)
 async def register_user(
-    session: SessionDep, exists: CheckSuperUser, register: Register
+    session: AsyncSessionDep, exists: CheckSuperUser, register: Register
 ):
     """Register first account."""
 
@@ -123,16 +129,17 @@ async def register_user(
     if (password := register.password) != register.password_2:
         raise HTTPException(422, "Password mismatch.")
 
+    secret = await async_hash_password(password)
     try:
         registered_user = {
             "name": register.username,
-            "secret": hash_password(password),
+            "secret": secret,
             "right": config.USERLEVEL["max"],
         }
         db_user = User.model_validate(registered_user)
         session.add(db_user)
-        session.commit()
-        session.refresh(db_user)
+        await session.commit()
+        await session.refresh(db_user)
 
     except IntegrityError:
         raise already_exists
@@ -146,25 +153,27 @@ async def logout(response: Response):
 
 
 @router.get("/camera_token")
-async def get_cam_token(session: SessionDep, current_user: CurrentUser) -> CameraToken:
+async def get_cam_token(
+    session: AsyncSessionDep, current_user: CurrentUser
+) -> CameraToken:
     """Get camera token."""
-    db_user = session.get(User, current_user.id)
+    db_user = await session.get(User, current_user.id)
     return db_user
 
 
 @router.post("/camera_token", status_code=204)
-async def post_cam_token(session: SessionDep, current_user: CurrentUser):
+async def post_cam_token(session: AsyncSessionDep, current_user: CurrentUser):
     """Create camera token."""
-    db_user = session.get(User, current_user.id)
+    db_user = await session.get(User, current_user.id)
     db_user.sqlmodel_update({"cam_token": f"B{random.getrandbits(256)}"})
     session.add(db_user)
-    session.commit()
+    await session.commit()
 
 
 @router.delete("/camera_token", status_code=204)
-async def delete_cam_token(session: SessionDep, current_user: CurrentUser):
+async def delete_cam_token(session: AsyncSessionDep, current_user: CurrentUser):
     """Delete camera token."""
-    db_user = session.get(User, current_user.id)
+    db_user = await session.get(User, current_user.id)
     db_user.sqlmodel_update({"cam_token": None})
     session.add(db_user)
-    session.commit()
+    await session.commit()
@@ -4,46 +4,48 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Request, Response
 
-from app.api.depends import SessionDep
+from app.api.depends import AsyncSessionDep
 from app.models import ButtonCreate, ButtonPublic, Buttons, ButtonUpdate
 
 router = APIRouter()
 
 
 @router.get("/")
-async def get_buttons(session: SessionDep) -> list[ButtonPublic]:
+async def get_buttons(session: AsyncSessionDep) -> list[ButtonPublic]:
     """List buttons."""
-    return session.get_all(Buttons)
+    return await session.get_all(Buttons)
 
 
 @router.post("/", status_code=204)
-async def post_buttons(session: SessionDep, button: ButtonCreate, request: Request):
+async def post_buttons(
+    session: AsyncSessionDep, button: ButtonCreate, request: Request
+):
     """Create button."""
     button = Buttons.model_validate(button)
     session.add(button)
-    session.commit()
-    session.refresh(button)
+    await session.commit()
+    await session.refresh(button)
     return Response(headers={"Location": f"{request.url._url}{button.id}"})
 
 
 @router.get("/{id}")
-async def get(session: SessionDep, id: int) -> ButtonPublic:
+async def get(session: AsyncSessionDep, id: int) -> ButtonPublic:
     """Get button."""
-    return session.get_or_404(Buttons, id, error_desc="Button not found")
+    return await session.get_or_404(Buttons, id, error_desc="Button not found")
 
 
 @router.put("/{id}", status_code=204)
-async def put(session: SessionDep, button: ButtonUpdate, id: int):
+async def put(session: AsyncSessionDep, button: ButtonUpdate, id: int):
     """Set button."""
-    db_button = session.get_or_404(Buttons, id, error_desc="Button not found")
+    db_button = await session.get_or_404(Buttons, id, error_desc="Button not found")
     db_button.sqlmodel_update(button)
     session.add(db_button)
-    session.commit()
+    await session.commit()
 
 
 @router.delete("/{id}", status_code=204)
-async def delete(session: SessionDep, id: int):
+async def delete(session: AsyncSessionDep, id: int):
     """Delete button."""
-    db_button = session.get_or_404(Buttons, id, error_desc="Button not found")
-    session.delete(db_button)
-    session.commit()
+    db_button = await session.get_or_404(Buttons, id, error_desc="Button not found")
+    await session.delete(db_button)
+    await session.commit()
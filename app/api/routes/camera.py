@@ -9,6 +9,7 @@ import time
 from fastapi import APIRouter, Response
 from fastapi.responses import StreamingResponse
 
+from app.core.metrics import MJPEG_BYTES, MJPEG_CLIENTS, MJPEG_FRAMES
 from app.core.raspiconfig import raspiconfig
 
 router = APIRouter()
@@ -59,10 +60,17 @@ def _get_shm_cam(preview_path=None):
 
 def _gather_img(preview_path, delay=0.1):
     """Stream image."""
-    while True:
-        yield (
-            b"--PIderman\r\nContent-Type: image/jpeg\r\n\r\n"
-            + _get_shm_cam(preview_path)
-            + b"\r\n"
-        )
-        time.sleep(delay)
+    MJPEG_CLIENTS.inc()
+    try:
+        while True:
+            frame = (
+                b"--PIderman\r\nContent-Type: image/jpeg\r\n\r\n"
+                + _get_shm_cam(preview_path)
+                + b"\r\n"
+            )
+            MJPEG_FRAMES.inc()
+            MJPEG_BYTES.inc(len(frame))
+            yield frame
+            time.sleep(delay)
+    finally:
+        MJPEG_CLIENTS.dec()
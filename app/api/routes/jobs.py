@@ -0,0 +1,58 @@
+"""Api background jobs."""
+
+import os
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+
+from app.core.config import config
+from app.core.jobs import jobs
+from app.models import Jobs
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get(
+    type: str | None = Query(description="Job type", default=None),
+    state: str | None = Query(description="Job state", default=None),
+) -> list[Jobs]:
+    """Get jobs, newest first."""
+    return jobs.get_all(type, state)
+
+
+@router.get("/{id}")
+async def get_job(id: str) -> Jobs:
+    """Get job status and progress."""
+    if (job := jobs.get(id)) is None:
+        raise HTTPException(404, "Job not found")
+    return job
+
+
+@router.post("/{id}/cancel", status_code=202)
+async def post_cancel(id: str) -> Jobs:
+    """Cancel job."""
+    if (job := jobs.cancel(id)) is None:
+        raise HTTPException(404, "Job not found")
+    return job
+
+
+@router.get("/{id}/result", responses={200: {"content": {"application/zip": {}}}})
+async def get_result(id: str) -> Any:
+    """Get job result, files are downloaded once."""
+    if (job := jobs.get(id)) is None:
+        raise HTTPException(404, "Job not found")
+    if job.state != "success":
+        raise HTTPException(409, f"Job is {job.state}")
+    if isinstance(job.result, dict) and (file := job.result.get("file")):
+        path = os.path.join(config.JOB_EXPORT_FOLDER, file)
+        if not os.path.isfile(path):
+            raise HTTPException(410, "Job result already downloaded")
+        return FileResponse(
+            path,
+            filename=job.result.get("filename", file),
+            background=BackgroundTask(os.remove, path),
+        )
+    return job.result
@@ -1,12 +1,13 @@
 """Api logs."""
 
 from datetime import datetime as dt
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from app.core.log import delete_log, get_logs
-from app.core.raspiconfig import raspiconfig
+from app.core.config import Level
+from app.core.log import clear_log, get_log_files, read_logs
 from app.models import Log
 
 router = APIRouter()
@@ -14,30 +15,65 @@ router = APIRouter()
 
 @router.get("/")
 async def get(
-    reverse: bool = Query(description="Ordering display (True|False)",default=True),
+    response: Response,
+    reverse: Annotated[bool, Query(description="Ordering display (True|False)")] = True,
+    limit: Annotated[int, Query(description="Page size", ge=1, le=5000)] = 100,
+    before: Annotated[str | None, Query(description="Cursor to older entries")] = None,
+    after: Annotated[str | None, Query(description="Cursor to newer entries")] = None,
+    level: Annotated[Level | None, Query(description="Level")] = None,
+    since: Annotated[dt | None, Query(description="From datetime")] = None,
+    until: Annotated[dt | None, Query(description="To datetime")] = None,
+    search: Annotated[str | None, Query(description="Message contains")] = None,
 ) -> list[Log]:
-    """List log."""
-    return get_logs(reverse)
+    """List log, newest entries first.
+
+    Cursors for the next pages are returned in X-Log-Before and X-Log-After.
+    """
+    try:
+        logs, before, after = read_logs(
+            limit, before, after, level, since, until, search
+        )
+    except ValueError as error:
+        raise HTTPException(422, str(error))
+
+    if before:
+        response.headers["X-Log-Before"] = before
+    if after:
+        response.headers["X-Log-After"] = after
+    return logs if reverse else logs[::-1]
 
 
 @router.delete("/", status_code=204)
 async def delete():
     """Delete log."""
     try:
-        delete_log(1)
-    except Exception as error:  # pylint: disable=W0718
+        clear_log()
+    except OSError as error:
         raise HTTPException(422, error)
 
 
-@router.get("/download", response_class=FileResponse, responses={200: {"content": {"text/plain": {}} }})
+@router.get(
+    "/download",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/plain": {}}}},
+)
 async def download():
     """Log."""
     date_str = dt.now().strftime("%Y%m%d_%H%M%S")
     logname = f"viewpicam_{date_str}.log"
 
-    response = FileResponse(
-        path=raspiconfig.log_file,
-        content_disposition_type="attachment",
-        filename=logname,
+    headers = {"Content-Disposition": f"attachment; filename={logname}"}
+    return StreamingResponse(
+        _iter_log_files(get_log_files()), media_type="text/plain", headers=headers
     )
-    return response
+
+
+def _iter_log_files(log_files: list[str]):
+    """Stream log segments."""
+    for log_file in log_files:
+        try:
+            with open(log_file, "rb") as file:
+                while chunk := file.read(65536):
+                    yield chunk
+        except FileNotFoundError:
+            continue
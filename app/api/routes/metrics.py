@@ -0,0 +1,16 @@
+"""Api metrics."""
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
+
+router = APIRouter()
+
+
+@router.get("/", response_class=PlainTextResponse)
+async def get() -> PlainTextResponse:
+    """Get metrics in Prometheus text format."""
+    if not registry.enabled:
+        raise HTTPException(404, "Metrics disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -7,10 +7,10 @@ from fastapi import APIRouter, HTTPException
 from app.core.motion import (
     MotionError,
     async_get_motion,
-    async_parse_ini,
     async_restart_motion,
-    async_set_motion,
+    async_set_motions,
     async_write_motion,
+    motion_cache,
 )
 
 router = APIRouter()
@@ -29,17 +29,12 @@ async def get():
 async def put(motion: dict[str, Any]):
     """Set settings."""
     try:
-        is_changed = False
-
-        for key, value in motion.items():
-            await async_set_motion(key, value)
-            is_changed = True
-
-        if is_changed:
+        if motion:
+            await async_set_motions(motion)
             await async_write_motion()
-            rsp = await async_restart_motion()
-            return await async_parse_ini(rsp.text())
+            return await async_restart_motion()
     except (ValueError, MotionError) as error:
+        motion_cache.invalidate()
         raise HTTPException(422, str(error))
 
     return motion
@@ -1,119 +1,132 @@
 """Api gallery."""
 
 from datetime import datetime as dt
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
 
-from app.api.depends import SessionDep
-from app.core.filer import delete_mediafiles, get_zip, maintain_folders
+from app.api.depends import AsyncSessionDep
+from app.core.filer import delete_mediafiles, maintain_folders
+from app.core.jobs import jobs
 from app.core.raspiconfig import raspiconfig
-from app.core.transform import get_thumbs, video_convert
-from app.models import Files, LockMode
+from app.core.transform import get_thumbs
+from app.models import FilePublic, Files, Jobs, LockMode
 
 router = APIRouter()
 
 
 @router.get("/")
 async def get(
-    order: str = Query(description="Ordering thumbnail [desc|asc]", default="desc"),
-    show_types: str = Query(
-        description="Show types [both|image|video]", default="both"
-    ),
-    time_filter: int = Query(description="Time filter", default=1),
-) -> list[Files]:
-    """Get all media files."""
-    return get_thumbs(order.lower(), show_types.lower(), time_filter)
-
-
-@router.delete("/")
-async def delete(session: SessionDep, files: list[str]) -> list[str]:
-    """Delete all files or files list"""
-    deleted_ids = []
-    if files:
-        for id in files:
-            if thumb := session.get_or_404(Files, id):
-                if thumb.locked:
-                    continue
-                delete_mediafiles(thumb.name)
-                maintain_folders(raspiconfig.media_path, False, False)
-                deleted_ids.append(id)
-    else:
-        maintain_folders(raspiconfig.media_path, True, True)
-    session.close()
-    return deleted_ids
+    response: Response,
+    order: Annotated[str, Query(description="Ordering thumbnail [desc|asc]")] = "desc",
+    show_types: Annotated[
+        str, Query(description="Show types [both|image|video]")
+    ] = "both",
+    time_filter: Annotated[int, Query(description="Time filter")] = 1,
+    since: Annotated[dt | None, Query(description="From datetime")] = None,
+    until: Annotated[dt | None, Query(description="To datetime (excluded)")] = None,
+    limit: Annotated[int | None, Query(description="Page size", ge=1, le=1000)] = None,
+    cursor: Annotated[str | None, Query(description="Cursor to next page")] = None,
+) -> list[FilePublic]:
+    """Get media files, all of them without limit.
+
+    The cursor for the next page is returned in X-Previews-Next.
+    """
+    try:
+        thumbs, next_cursor = await run_in_threadpool(
+            get_thumbs,
+            order.lower(),
+            show_types.lower(),
+            time_filter,
+            since,
+            until,
+            limit,
+            cursor,
+        )
+    except ValueError as error:
+        raise HTTPException(422, str(error))
+
+    if next_cursor:
+        response.headers["X-Previews-Next"] = next_cursor
+    return thumbs
+
+
+@router.delete("/", status_code=202)
+async def delete(files: list[str]) -> Jobs:
+    """Delete all files or files list, result is the status of each id."""
+    return jobs.submit("delete", ids=files)
 
 
 @router.get("/{id}")
-async def get_thumb(session: SessionDep, id: str) -> Files:
+async def get_thumb(session: AsyncSessionDep, id: str) -> Files:
     """Get file information."""
-    return session.get_or_404(Files, id, error_desc="Thumb not found")
+    return await session.get_or_404(Files, id, error_desc="Thumb not found")
 
 
 @router.delete("/{id}", status_code=204)
-async def delete_thumb(session: SessionDep, id: str):
+async def delete_thumb(session: AsyncSessionDep, id: str):
     """Delete file."""
-    thumb = session.get_or_404(Files, id, error_desc="Thumb not found")
+    thumb = await session.get_or_404(Files, id, error_desc="Thumb not found")
     if thumb.locked:
         raise HTTPException(422, f"Protected thumbnail ({id})")
-    delete_mediafiles(thumb.name)
+    await run_in_threadpool(_delete_thumb, thumb.name)
+
+
+def _delete_thumb(name: str) -> None:
+    delete_mediafiles(name)
     maintain_folders(raspiconfig.media_path, False, False)
 
 
 @router.post("/lock_mode", status_code=204)
-async def post_thumb(session: SessionDep, lock_mode: LockMode):
+async def post_thumb(session: AsyncSessionDep, lock_mode: LockMode):
     """Lock Mode."""
     ids = lock_mode["ids"]
     mode = lock_mode["mode"] is True
     ids = [ids] if isinstance(ids, str) else ids
     for id in ids:
-        db_file = session.get_or_404(Files, id, error_desc="Thumb not found")
+        db_file = await session.get_or_404(Files, id, error_desc="Thumb not found")
         db_file.sqlmodel_update({"locked": mode})
         session.add(db_file)
-    session.commit()
+    await session.commit()
 
 
 @router.post("/{id}/lock", status_code=204)
-async def post_lock(session: SessionDep, id: str):
+async def post_lock(session: AsyncSessionDep, id: str):
     """Lock."""
-    db_file = session.get_or_404(Files, id, error_desc="Thumb not found")
+    db_file = await session.get_or_404(Files, id, error_desc="Thumb not found")
     if db_file.locked is True:
         return {"message": "Thumb is already locked"}, 201
     db_file.sqlmodel_update({"locked": True})
     session.add(db_file)
-    session.commit()
+    await session.commit()
 
 
 @router.post("/{id}/unlock", status_code=204)
-async def post_unlock(session: SessionDep, id: str):
+async def post_unlock(session: AsyncSessionDep, id: str):
     """Unlock."""
-    db_file = session.get_or_404(Files, id, error_desc="Thumb not found")
+    db_file = await session.get_or_404(Files, id, error_desc="Thumb not found")
     if db_file.locked is False:
         return {"message": "Thumb is already unlocked"}, 201
     db_file.sqlmodel_update({"locked": False})
     session.add(db_file)
-    session.commit()
+    await session.commit()
 
 
-@router.post("/{id}/convert", status_code=204)
-async def post_convert(session: SessionDep, id: str):
+@router.post("/{id}/convert", status_code=202)
+async def post_convert(session: AsyncSessionDep, id: str) -> Jobs:
     """Coonvert timelapse."""
-    thumb = session.get_or_404(Files, id, error_desc="Thumb not found")
-    video_convert(thumb.name)
+    thumb = await session.get_or_404(Files, id, error_desc="Thumb not found")
+    return jobs.submit("convert", filename=thumb.name)
 
 
-@router.post("/zipfile", response_class=StreamingResponse, responses={200: {"content": {"application/zip": {}} }})
-async def post_zipfile(session: SessionDep, thumbs: list[str] | str):
-    """Make Zip from thumbs list."""
+@router.post("/zipfile", status_code=202)
+async def post_zipfile(session: AsyncSessionDep, thumbs: list[str] | str) -> Jobs:
+    """Make Zip from thumbs list, download from job result."""
     date_str = dt.now().strftime("%Y%m%d_%H%M%S")
     zipname = f"cam_{date_str}.zip"
 
     thumbs = [thumbs] if isinstance(thumbs, str) else thumbs
-    if thumbs:
-        zip_list = [
-            thumb.name for id in thumbs if (thumb := session.get_or_404(Files, id))
-        ]
-        raw_file = get_zip(zip_list)
-
-    headers = {"Content-Disposition": f"attachment; filename={zipname}"}
-    return StreamingResponse(raw_file, media_type="application/zip", headers=headers)
+    for id in thumbs:
+        await session.get_or_404(Files, id, error_desc="Thumb not found")
+    return jobs.submit("zip", ids=thumbs, zipname=zipname)
@@ -0,0 +1,37 @@
+"""Api request timings and profiling."""
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import config
+from app.core.profiling import route_timings, sample_stacks, stall_monitor
+
+router = APIRouter()
+
+
+@router.get("/timings")
+async def get_timings() -> list[dict[str, Any]]:
+    """Get latency percentiles by route."""
+    return route_timings.summary()
+
+
+@router.get("/stalls")
+async def get_stalls() -> list[dict[str, Any]]:
+    """Get recent event loop stalls, with the loop stack."""
+    return list(stall_monitor.stalls)
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile(
+    seconds: float = Query(description="Duration", default=10, gt=0),
+    interval: float = Query(description="Sampling interval", default=0.01, gt=0),
+) -> PlainTextResponse:
+    """Sample all threads, collapsed stacks for flamegraph tools."""
+    if not config.PROFILER_ENABLED:
+        raise HTTPException(404, "Profiler disabled")
+    if seconds > config.PROFILER_MAX_SECONDS:
+        raise HTTPException(422, f"Duration above {config.PROFILER_MAX_SECONDS}s")
+    return PlainTextResponse(await run_in_threadpool(sample_stacks, seconds, interval))
@@ -4,7 +4,7 @@ from fastapi import APIRouter, HTTPException
 
 from app.core.rsync import rsync
 from app.core.settings import read, write
-from app.models import Rsync
+from app.models import Rsync, RsyncJob
 
 router = APIRouter()
 
@@ -27,9 +27,15 @@ async def delete():
     write(Rsync.model_construct().model_dump())
 
 
-@router.post("/exec", status_code=204)
-async def execute_rsync():
-    """Post action."""
-    state = await rsync.execute()
-    if state is False:
-        raise HTTPException(422, "Rsync failed")
+@router.post("/exec", status_code=202)
+async def execute_rsync() -> RsyncJob:
+    """Start rsync job."""
+    return rsync.trigger()
+
+
+@router.get("/job")
+async def get_job() -> RsyncJob:
+    """Get current rsync job."""
+    if rsync.job is None:
+        raise HTTPException(404, "No rsync job")
+    return rsync.job
@@ -5,19 +5,16 @@ from datetime import datetime as dt
 from datetime import timedelta as td
 from datetime import timezone
 
-import pytz
-import zoneinfo
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import select
-from suntime import Sun, SunTimeException
-from timezonefinder import TimezoneFinder
 
 from app.api.depends import SessionDep
 from app.core.config import config
 from app.core.fifo import send_pipe
 from app.core.log import set_log_level, write_log
 from app.core.settings import read, write
-from app.core.utils import set_timezone
+from app.core.utils import available_timezones, set_timezone, timezone_at
 from app.exceptions import ViewPiCamException
 from app.models import (
     Calendar,
@@ -58,8 +55,10 @@ async def put(schedule: Schedule):
     send_pipe(config.SCHEDULE_RESET)
 
 
+# Sync routes run in the threadpool, relationships and get_calendar are shared
+# with the scheduler thread
 @router.put("/scheduler", status_code=204)
-async def put_scheduler(session: SessionDep, scheduler: list[SchedulerUpdate]):
+def put_scheduler(session: SessionDep, scheduler: list[SchedulerUpdate]):
     """Set settings."""
     for item in scheduler:
         schedule = session.exec(
@@ -82,21 +81,19 @@ async def put_scheduler(session: SessionDep, scheduler: list[SchedulerUpdate]):
 
 
 @router.get("/scheduler/{daymode_id}")
-async def get_scheduler(
-    session: SessionDep, daymode_id: int
-) -> list[SchedulerWithCalendars]:
+def get_scheduler(session: SessionDep, daymode_id: int) -> list[SchedulerWithCalendars]:
     """Get settings scheduler."""
     return session.exec(select(Scheduler).filter_by(daysmode_id=daymode_id)).all()
 
 
 @router.get("/scheduler")
-async def get_schedulers(session: SessionDep) -> list[SchedulerWithCalendars]:
+def get_schedulers(session: SessionDep) -> list[SchedulerWithCalendars]:
     """Get all schedulers."""
     return session.get_all(Scheduler)
 
 
 @router.get("/period/{id}", status_code=201)
-async def get_period(session: SessionDep, id: int | None = None) -> Period:
+def get_period(session: SessionDep, id: int | None = None) -> Period:
     """Post day mode and return period."""
     if id not in [0, 1, 2]:
         raise HTTPException(422, "Daymode not exist")
@@ -125,10 +122,7 @@ async def get_gmtoffset() -> GMT_Offset:
 @router.get("/timezones", status_code=201)
 async def get_timezone() -> list[str]:
     """Timezone."""
-    timezones = zoneinfo.available_timezones()
-    timezone_array = list(timezones)
-    timezone_array.sort()
-    return timezone_array
+    return available_timezones()
 
 
 @router.get("/jstime", status_code=201)
@@ -140,8 +134,9 @@ async def get_time() -> int:
 @router.post("/timezonefinder", status_code=201)
 async def post_timezonefinder(coordinates: Coordinates) -> str:
     """Detect timezone with coordinates."""
-    tf = TimezoneFinder()
-    return tf.timezone_at(lng=coordinates.longitude, lat=coordinates.latitude)
+    return await run_in_threadpool(
+        timezone_at, coordinates.latitude, coordinates.longitude
+    )
 
 
 def time_offset(offset: int | float | str = 0) -> td:
@@ -149,6 +144,8 @@ def time_offset(offset: int | float | str = 0) -> td:
     if isinstance(offset, (int, float)):
         noffset = td(hours=offset)
     else:
+        import pytz
+
         try:
             gmt_time = dt.now(pytz.timezone(offset))
             noffset = gmt_time.utcoffset()
@@ -175,6 +172,8 @@ def dt_now() -> dt:
 
 def sun_info(mode: str) -> dt:
     """Return sunset or sunrise datetime."""
+    from suntime import Sun, SunTimeException
+
     data = read()
     offset = time_offset(data["gmt_offset"])
     sun = Sun(data["latitude"], data["longitude"])
@@ -1,18 +1,22 @@
 """Blueprint Settings API."""
 
 import logging
+import os
+import tempfile
 from datetime import datetime as dt
 
 from fastapi import APIRouter, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from sqlmodel import delete
 
-from app.api.depends import SessionDep
 from app.core.config import config
-from app.core.filer import allowed_file, update_img_db, zip_extract, zip_folder
+from app.core.db import async_dispose_engines, checkpoint, engine, upgrade_database
+from app.core.filer import allowed_file, zip_extract, zip_folder
+from app.core.jobs import jobs
 from app.core.raspiconfig import RaspiConfigError, raspiconfig
+from app.core.security import auth_cache
 from app.core.settings import read, write
-from app.models import Config, Files, Macro
+from app.models import Config, Jobs, Macro
 
 router = APIRouter()
 logger = logging.getLogger("uvicorn.error")
@@ -64,25 +68,46 @@ async def post_macro(macro: Macro):
             raise HTTPException(422, error.args[0].strerror)
 
 
-@router.get("/backup", response_class=StreamingResponse, responses={200: {"content": {"application/zip": {}} }})
+@router.get(
+    "/backup",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/zip": {}}}},
+)
 async def get_backup():
     """Get backup."""
     date_str = dt.now().strftime("%Y%m%d_%H%M%S")
     zipname = f"config_{date_str}.zip"
+    checkpoint()
     zip_file = zip_folder(config.CONFIG_FOLDER)
 
     headers = {"Content-Disposition": f"attachment; filename={zipname}"}
     return StreamingResponse(zip_file, media_type="application/zip", headers=headers)
 
 
-@router.post("/restore", status_code=204)
-async def post_restore(session: SessionDep, file: UploadFile):
-    """Upload backup file."""
-    if file and allowed_file(file):
-        zip_extract(file.file, config.CONFIG_FOLDER)
-        session.exec(delete(Files))
-        session.commit()
-        update_img_db()
+@router.post("/restore", status_code=202)
+async def post_restore(file: UploadFile) -> Jobs:
+    """Upload backup file, thumbs are reindexed in background."""
+    if not (file and allowed_file(file)):
+        raise HTTPException(422, "File not allowed")
+    checkpoint()
+    await async_dispose_engines()
+    await run_in_threadpool(_restore, file.file)
+    auth_cache.clear()
+    return jobs.submit("reindex")
+
+
+def _restore(file) -> None:
+    """Extract backup aside, migrate its database, then move files in place."""
+    with tempfile.TemporaryDirectory(dir=config.CONFIG_FOLDER) as folder:
+        zip_extract(file, folder)
+        # Backups made before later migrations lack their tables
+        database = os.path.join(folder, os.path.basename(engine.url.database))
+        if os.path.isfile(database):
+            upgrade_database(f"sqlite:///{database}")
+        for name in os.listdir(folder):
+            os.replace(
+                os.path.join(folder, name), os.path.join(config.CONFIG_FOLDER, name)
+            )
 
 
 async def _async_get_config():
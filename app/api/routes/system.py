@@ -6,7 +6,7 @@ from fastapi import APIRouter, HTTPException, Query
 from httpx import HTTPError
 from sqlmodel import select
 
-from app.api.depends import SessionDep
+from app.api.depends import AsyncSessionDep
 from app.core.config import Locale, Type, config
 from app.core.process import execute_cmd, self_terminate
 from app.core.raspiconfig import RaspiConfigError, raspiconfig
@@ -118,12 +118,13 @@ async def get_locales() -> list[Locale]:
 
 @router.get("/presets")
 async def get_presets(
-    session: SessionDep, preset: Type | None = Query(description="Preset", default=None)
+    session: AsyncSessionDep,
+    preset: Type | None = Query(description="Preset", default=None),
 ) -> list[Presets]:
     """Presets video."""
     if preset:
-        return session.exec(select(Presets).filter_by(mode=preset)).all()
-    return session.get_all(Presets)
+        return (await session.exec(select(Presets).filter_by(mode=preset))).all()
+    return await session.get_all(Presets)
 
 
 @router.get("/userlevel")
@@ -3,9 +3,13 @@
 import asyncio
 import logging
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
+from app.api.depends import WebSocketUser
+from app.core.config import Level, config
+from app.core.logwriter import log_tail
 from app.core.raspiconfig import raspiconfig
+from app.core.rsync import rsync
 
 router = APIRouter()
 
@@ -25,3 +29,53 @@ async def websocket_endpoint(websocket: WebSocket):
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
+
+
+@router.websocket("/rsync")
+async def websocket_rsync(websocket: WebSocket, user: WebSocketUser):
+    """Websocket rsync job progress"""
+    await websocket.accept()
+    last = None
+    try:
+        while True:
+            await asyncio.sleep(0.5)
+            if rsync.job and (job := rsync.job.model_dump(mode="json")) != last:
+                await websocket.send_json(job)
+                last = job
+
+    except WebSocketDisconnect:
+        logger.info("WebSocket disconnected")
+
+
+@router.websocket("/logs")
+async def websocket_logs(
+    websocket: WebSocket,
+    user: WebSocketUser,
+    level: Level = Query(description="Minimum level", default=Level.debug),
+    backlog: int = Query(
+        description="Entries replayed on connect",
+        default=config.LOG_TAIL_BACKLOG,
+        ge=0,
+        le=config.LOG_TAIL_BACKLOG,
+    ),
+):
+    """Websocket live log"""
+    await websocket.accept()
+    min_level = logging.getLevelName(level.value)
+    lines, subscriber = log_tail.subscribe()
+
+    async def send(line_level: str, line: str) -> None:
+        line_no = logging.getLevelName(line_level)
+        if isinstance(line_no, int) and line_no >= min_level:
+            await websocket.send_text(line)
+
+    try:
+        for line_level, line in lines[-backlog:] if backlog else []:
+            await send(line_level, line)
+        while True:
+            await send(*await subscriber.get())
+
+    except WebSocketDisconnect:
+        logger.info("WebSocket disconnected")
+    finally:
+        log_tail.unsubscribe(subscriber)
@@ -50,7 +50,18 @@ class Config(BaseSettings):
     DEBUG: bool = False
     SECRET_KEY: str = "12345678900987654321"
     TOKEN_LIFETIME: int = 60  # minutes
+    AUTH_CACHE_TTL: float = 30.0  # seconds, 0 disables
+    # Password hashing cost, hashes are upgraded on next login
+    PASSWORD_SCRYPT_N: int = 16384
+    PASSWORD_SCRYPT_R: int = 8
+    PASSWORD_SCRYPT_P: int = 1
+    PASSWORD_WORKERS: int = 1
     GMT_OFFSET: str = "Etc/UTC"
+    # Load timezone finder data at startup, instead of first lookup
+    TIMEZONE_WARMUP: bool = False
+    # Coordinates decimals kept for cached lookups (3 is about 100 m)
+    TIMEZONE_PRECISION: int = 3
+    TIMEZONE_CACHE_SIZE: int = 256
 
     # Allowed extension for mask file
     ALLOWED_EXTENSIONS: list[str] = ["pgm", "zip"]
@@ -62,15 +73,35 @@ class Config(BaseSettings):
 
     # File where default settings
     CONFIG_FOLDER: str = "./config"
+    ALEMBIC_FOLDER: str = "./alembic"
     RASPI_CONFIG: str = "/etc/raspimjpeg"
     RASPI_BINARY: str = "/usr/bin/raspimjpeg"
     RSYNC_BINARY: str = "/usr/bin/rsync"
 
+    # Timelapse encoder, JPEG frames on stdin, output path appended
+    CONVERT_CMD: str = (
+        "ffmpeg -hide_banner -loglevel error -y -f image2pipe -framerate {fps}"
+        " -i - -c:v libx264 -pix_fmt yuv420p -threads {threads} -f mp4"
+    )
+    CONVERT_NICE: int = 10
+
+    # Seconds a failed process lookup is remembered
+    PID_CACHE_TTL: float = 5.0
+
     # Character used to flatten file paths
     THUMBNAIL_EXT: str = ".th.jpg"
 
     # Database URI
     SQLALCHEMY_DATABASE_URI: str = f"sqlite:///{CONFIG_FOLDER}/config.db"
+    # API routes use async sessions (aiosqlite), or sync sessions in threadpool
+    SQLALCHEMY_ASYNC: bool = True
+    # SQLite profile applied on connect, empty value keeps the default
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT: int = 5000  # milliseconds
+    SQLITE_MMAP_SIZE: int = 67108864  # bytes
+    SQLITE_CACHE_SIZE: int = -16384  # pages, negative is KiB
+    SQLITE_TEMP_STORE: str = "MEMORY"
 
     # Userlevel
     USERLEVEL_MIN: int = 1
@@ -88,6 +119,17 @@ class Config(BaseSettings):
     LOCALES: list[str] = ["EN", "FR"]
     LOG_LEVEL: str = "DEBUG"
 
+    # Log writer queue
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_FLUSH_INTERVAL: float = 0.5  # seconds
+    LOG_BATCH_SIZE: int = 500
+    # Log segments, size is also bounded by raspimjpeg log_size lines
+    LOG_MAX_BYTES: int = 2097152
+    LOG_SEGMENTS: int = 4
+    # Live log tail
+    LOG_TAIL_BACKLOG: int = 50
+    LOG_TAIL_QUEUE_SIZE: int = 1000
+
     # Macros name files
     MACROS: list[str] = [
         "error_soft",
@@ -118,6 +160,12 @@ class Config(BaseSettings):
 
     # Motion
     MOTION_URL: str = "http://127.0.0.1:6642/0/"
+    MOTION_PIDFILE: str = "/var/run/motion/motion.pid"
+    MOTION_TIMEOUT: float = 5.0  # seconds
+    MOTION_CONNECT_TIMEOUT: float = 2.0  # seconds
+    MOTION_POOL_SIZE: int = 4
+    MOTION_KEEPALIVE: float = 30.0  # seconds
+    MOTION_CACHE_TTL: float = 10.0  # seconds
     MOTION_CONFIGBACKUP: str = "motionPars.json"
     MOTION_PARS: str = "motionPars"
     MOLTION_FILTER: list[str] = [
@@ -145,6 +193,35 @@ class Config(BaseSettings):
         "on_area_detected",
     ]
 
+    # Rsync on capture events
+    RSYNC_DEBOUNCE: float = 10.0  # seconds
+    RSYNC_MAX_LATENCY: float = 60.0  # seconds
+
+    # Threads unlinking files of a bulk delete, thumbs per commit
+    DELETE_WORKERS: int = 4
+    DELETE_BATCH_SIZE: int = 100
+
+    # Background jobs, concurrent jobs by type (default 1), finished jobs kept
+    JOB_CONCURRENCY: dict[str, int] = {"convert": 1, "delete": 1, "zip": 1}
+    JOB_HISTORY: int = 100
+    # Job result files, named after the job id, removed once downloaded
+    JOB_EXPORT_FOLDER: str = "./exports"
+
+    # Purge, files deleted per batch and time spent per scheduler tick
+    PURGE_BATCH_SIZE: int = 100
+    PURGE_TIME_BUDGET: float = 0.2  # seconds
+
+    # Collect metrics served on /metrics, disabled updates are no-ops
+    METRICS_ENABLED: bool = False
+
+    # Latencies kept by route, event loop stall reported above threshold
+    REQUEST_TIMING_WINDOW: int = 512
+    LOOP_STALL_THRESHOLD: float = 0.25  # seconds, 0 disables
+    LOOP_STALL_HISTORY: int = 20
+    # Sampling profiler endpoint
+    PROFILER_ENABLED: bool = False
+    PROFILER_MAX_SECONDS: float = 60.0
+
     RETRY_STATUS: int = 10
     SLEEP_STATUS: float = 0.01
 
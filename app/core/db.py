@@ -1,7 +1,151 @@
 from __future__ import annotations
 
-from sqlmodel import create_engine
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session, create_engine
 
 from app.core.config import config
+from app.core.metrics import instrument_engine
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite"}
+
+
+def sqlite_pragmas() -> dict[str, str | int]:
+    """Return configured SQLite pragmas."""
+    pragmas = {
+        "journal_mode": config.SQLITE_JOURNAL_MODE,
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "cache_size": config.SQLITE_CACHE_SIZE,
+        "temp_store": config.SQLITE_TEMP_STORE,
+    }
+    return {name: value for name, value in pragmas.items() if value != ""}
+
+
+def create_db_engine(uri: str, pragmas: dict[str, str | int] | None = None) -> Engine:
+    """Create engine, pragmas are set on each new SQLite connection."""
+    db_engine = create_engine(uri, echo=False)
+    _set_pragmas(db_engine, pragmas)
+    instrument_engine(db_engine)
+    return db_engine
+
+
+def create_async_db_engine(
+    uri: str, pragmas: dict[str, str | int] | None = None
+) -> AsyncEngine:
+    """Create async engine (aiosqlite for SQLite) with the same pragmas."""
+    scheme, _, rest = uri.partition("://")
+    db_engine = create_async_engine(
+        f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}", echo=False
+    )
+    _set_pragmas(db_engine.sync_engine, pragmas)
+    instrument_engine(db_engine.sync_engine)
+    return db_engine
+
+
+def _set_pragmas(db_engine: Engine, pragmas: dict[str, str | int] | None) -> None:
+    if pragmas and db_engine.dialect.name == "sqlite":
+
+        @event.listens_for(db_engine, "connect")
+        def set_pragmas(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return async engine, created on first use."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine(
+            str(config.SQLALCHEMY_DATABASE_URI), sqlite_pragmas()
+        )
+    return _async_engine
+
+
+async def async_dispose_engines() -> None:
+    """Close pooled connections, they reopen the database file on next use."""
+    engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+def checkpoint() -> None:
+    """Move WAL content into the database file, before copying it."""
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def upgrade_database(uri: str) -> None:
+    """Migrate database to the latest revision, as container start does."""
+    from alembic.config import Config
+
+    from alembic import command
+
+    # No ini file, its logging setup would replace the server one
+    alembic_config = Config()
+    alembic_config.set_main_option("script_location", config.ALEMBIC_FOLDER)
+    alembic_config.set_main_option("sqlalchemy.url", uri)
+    command.upgrade(alembic_config, "head")
+
+
+class ThreadSession:
+    """Async session interface over a sync Session run in the threadpool.
+
+    Used when async database sessions are disabled.
+    """
+
+    def __init__(self, session: Session) -> None:
+        """Initialize."""
+        self.session = session
+
+    def add(self, instance: Any) -> None:
+        """Add instance."""
+        self.session.add(instance)
+
+    async def exec(self, statement) -> _Rows:
+        """Execute statement, rows are fetched in the threadpool."""
+        return _Rows(
+            await run_in_threadpool(lambda: self.session.exec(statement).all())
+        )
+
+    async def get(self, entity, ident) -> Any:
+        """Get by primary key."""
+        return await run_in_threadpool(self.session.get, entity, ident)
+
+    async def delete(self, instance: Any) -> None:
+        """Delete instance."""
+        await run_in_threadpool(self.session.delete, instance)
+
+    async def commit(self) -> None:
+        """Commit."""
+        await run_in_threadpool(self.session.commit)
+
+    async def refresh(self, instance: Any) -> None:
+        """Refresh instance."""
+        await run_in_threadpool(self.session.refresh, instance)
+
+
+class _Rows(list):
+    """Fetched rows with the result methods used by routes."""
+
+    def all(self) -> list:
+        return list(self)
+
+    def first(self) -> Any:
+        return self[0] if self else None
+
+    def one(self) -> Any:
+        if len(self) != 1:
+            raise ValueError(f"Expected one row, got {len(self)}")
+        return self[0]
+
 
-engine = create_engine(str(config.SQLALCHEMY_DATABASE_URI), echo=False)
+_async_engine: AsyncEngine | None = None
+engine = create_db_engine(str(config.SQLALCHEMY_DATABASE_URI), sqlite_pragmas())
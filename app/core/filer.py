@@ -6,23 +6,42 @@ import os
 import re
 import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
 from io import BytesIO
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlmodel import Session, col, delete, select
 
 from app.core.config import config
 from app.core.db import engine
+from app.core.jobs import JobContext, export_path, jobs
 from app.core.log import write_log
+from app.core.metrics import INDEX_SECONDS, INDEXED_FILES
 from app.core.process import execute_cmd
 from app.core.raspiconfig import raspiconfig
 from app.exceptions import ViewPiCamException
-from app.models import Files
+from app.models import DeleteResult, Files
 
 
-def find_lapse_files(filename: str) -> list[str]:
-    """Return lapse files."""
+def scan_media_files(path: str | None = None) -> dict[str, float]:
+    """Return media files with their modification time, in one scan."""
+    path = path or raspiconfig.media_path
+    with os.scandir(path) as entries:
+        return {
+            entry.name: entry.stat().st_mtime
+            for entry in entries
+            if entry.is_file() and get_file_ext(entry.name) in ["jpg", "mp4"]
+        }
+
+
+def find_lapse_files(
+    filename: str, scanfiles: dict[str, float] | None = None
+) -> list[str]:
+    """Return lapse files.
+
+    Pass `scan_media_files()` to resolve several lapses with one folder scan.
+    """
     media_path = raspiconfig.media_path
     files = {}
     lapsefiles = []
@@ -33,21 +52,20 @@ def find_lapse_files(filename: str) -> list[str]:
     if not os.path.isfile(fullname):
         return lapsefiles
     start = os.path.getmtime(fullname)
-    scanfiles = list_folder_files(f"{media_path}")
-    for file in scanfiles:
-        if file.find(batch):
-            if (
-                (not is_thumbnail(file))
-                and (ext := get_file_ext(file))
-                and ext == "jpg"
-            ):
-                f_date = os.path.getmtime(f"{media_path}/{file}")
-                if f_date >= start:
-                    files[file] = str(f_date) + file
+    if scanfiles is None:
+        scanfiles = scan_media_files(media_path)
+    for file, f_date in scanfiles.items():
+        if (
+            file.find(batch)
+            and not is_thumbnail(file)
+            and get_file_ext(file) == "jpg"
+            and f_date >= start
+        ):
+            files[file] = str(f_date) + file
 
     lapse_count = 1
     for key in sorted(files):
-        if key[int(str(lapse_count).zfill(padlen)) :]:  # noqa: E203
+        if key[int(str(lapse_count).zfill(padlen)) :]:
             lapsefiles.append(f"{media_path}/{key}")
             lapse_count += 1
         else:
@@ -55,38 +73,113 @@ def find_lapse_files(filename: str) -> list[str]:
     return lapsefiles
 
 
-def delete_mediafiles(filename: str, delete: bool = True) -> int:
-    """Delete all files associated with a thumb name."""
+def get_media_files(
+    filename: str, scanfiles: dict[str, float] | None = None
+) -> list[str]:
+    """Return all paths associated with a thumb name, thumb last."""
     media_path = raspiconfig.media_path
-    size = 0
     type_file = get_file_type(filename)
 
-    def compute_delete_file(file_name, size, delete):
-        if os.path.isfile(file_name):
-            size += get_file_size(file_name)
-            if delete:
-                os.remove(file_name)
-
     if type_file == "t":
         #  For time lapse try to delete all from this batch
-        files = find_lapse_files(filename)
-        for file in files:
-            compute_delete_file(file, size, delete)
+        files = find_lapse_files(filename, scanfiles)
     else:
         thumb_file = data_file_name(filename)
-        compute_delete_file(f"{media_path}/{thumb_file}", size, delete)
+        files = [f"{media_path}/{thumb_file}"]
 
         if type_file == "v":
             raw_file = thumb_file[: thumb_file.find(".")]
-            for file in (
+            files += [
                 f"{media_path}/{thumb_file}.dat",
                 f"{media_path}/{raw_file}.h264",
                 f"{media_path}/{raw_file}.h264.bad",
                 f"{media_path}/{raw_file}.h264.log",
-            ):
-                compute_delete_file(file, size, delete)
+            ]
+
+    return files + [f"{media_path}/{filename}"]
+
+
+def remove_files(paths: list[str], delete: bool = True) -> int:
+    """Remove existing files, return their size in bytes."""
+    size = 0
+    for path in paths:
+        try:
+            size += get_file_size(path)
+            if delete:
+                os.remove(path)
+        except FileNotFoundError:
+            continue
+    return size
+
+
+def delete_media_batch(filenames: list[str]) -> dict[str, str | None]:
+    """Delete files of several thumbs in a worker pool.
+
+    Related files are resolved up front, database rows are left to the
+    caller. Return error by thumb name, None when deleted.
+    """
+    scanfiles = None
+    if any(get_file_type(filename) == "t" for filename in filenames):
+        scanfiles = scan_media_files()
+    paths = {filename: get_media_files(filename, scanfiles) for filename in filenames}
+
+    with ThreadPoolExecutor(config.DELETE_WORKERS) as executor:
+        futures = {
+            filename: executor.submit(remove_files, files)
+            for filename, files in paths.items()
+        }
+    return {
+        filename: str(error) if (error := future.exception()) else None
+        for filename, future in futures.items()
+    }
+
 
-    compute_delete_file(f"{media_path}/{filename}", size, delete)
+@jobs.handler("delete")
+def delete_thumbs(ctx: JobContext, ids: list[str]) -> list[dict[str, Any]]:
+    """Delete thumbs and their files, one commit per batch."""
+    if not ids:
+        maintain_folders(raspiconfig.media_path, True, True)
+        return []
+
+    details: dict[str, str | None] = {}
+    size = config.DELETE_BATCH_SIZE
+    for start in range(0, len(ids), size):
+        ctx.check()
+        batch = ids[start : start + size]
+        with Session(engine) as session:
+            thumbs = {
+                thumb.id: thumb
+                for thumb in session.exec(
+                    select(Files).where(col(Files.id).in_(batch))
+                ).all()
+            }
+            for id in batch:
+                if (thumb := thumbs.get(id)) is None:
+                    details[id] = "Thumb not found"
+                elif thumb.locked:
+                    details[id] = f"Protected thumbnail ({id})"
+
+            deletable = [thumb for id, thumb in thumbs.items() if id not in details]
+            errors = delete_media_batch([thumb.name for thumb in deletable])
+            for thumb in deletable:
+                if (error := errors[thumb.name]) is None:
+                    session.delete(thumb)
+                details[thumb.id] = error
+            session.commit()
+        ctx.progress(start + len(batch), len(ids))
+    maintain_folders(raspiconfig.media_path, False, False)
+
+    return [
+        DeleteResult(
+            id=id, deleted=details[id] is None, detail=details[id]
+        ).model_dump()
+        for id in ids
+    ]
+
+
+def delete_mediafiles(filename: str, delete: bool = True) -> int:
+    """Delete all files associated with a thumb name."""
+    size = remove_files(get_media_files(filename), delete)
 
     # Remove database
     with Session(engine) as session:
@@ -165,7 +258,7 @@ def get_file_index(file: str) -> str:
     """Return index file."""
     i = file.rfind(".", 0, len(file) - 8)
     if i > 0:
-        return file[i + 2 : len(file) - 7]  # noqa: E203
+        return file[i + 2 : len(file) - 7]
     return ""
 
 
@@ -279,6 +372,9 @@ def zip_folder(path: str) -> BytesIO:
     with zipfile.ZipFile(memory_file, "a") as zip_file:
         for root, dirs, files in os.walk(path):
             for file in files:
+                # SQLite WAL files are only valid with the open database
+                if file.endswith(("-wal", "-shm")):
+                    continue
                 try:
                     zip_file.write(os.path.join(root, file), file)
                 except FileNotFoundError:
@@ -292,6 +388,9 @@ def zip_extract(file, path: str):
     """Extract zip file."""
     archive = zipfile.ZipFile(file)
     for file in archive.namelist():
+        # Older backups hold SQLite WAL files, stale next to the restored database
+        if file.endswith(("-wal", "-shm")):
+            continue
         archive.extract(file, path)
 
 
@@ -300,12 +399,19 @@ def allowed_file(filename):
     return sub_type.lower() in config.ALLOWED_EXTENSIONS
 
 
-def get_zip(files: list) -> BytesIO:
-    """Zip files."""
+def get_zip(
+    files: list,
+    target: str | BytesIO | None = None,
+    ctx: JobContext | None = None,
+) -> str | BytesIO:
+    """Zip files, into target path if given."""
     media_path = raspiconfig.media_path
-    memory_file = BytesIO()
+    memory_file = BytesIO() if target is None else target
     with zipfile.ZipFile(memory_file, "a") as zip_file:
-        for file in files:
+        for idx, file in enumerate(files):
+            if ctx:
+                ctx.check()
+                ctx.progress(idx, len(files))
             file_name = data_file_name(file)
             try:
                 data = zipfile.ZipInfo(file_name)
@@ -316,13 +422,31 @@ def get_zip(files: list) -> BytesIO:
                 )
             except FileNotFoundError:
                 continue
-    memory_file.seek(0)
+    if isinstance(memory_file, BytesIO):
+        memory_file.seek(0)
     return memory_file
 
 
-def update_img_db() -> None:
-    """Add thumb to database."""
+@jobs.handler("zip")
+def zip_thumbs(ctx: JobContext, ids: list[str], zipname: str) -> dict[str, str]:
+    """Zip thumbs data files into the job export file."""
+    with Session(engine) as session:
+        names = session.exec(select(Files.name).where(col(Files.id).in_(ids))).all()
+    path = export_path(ctx.id, "zip")
+    try:
+        get_zip(names, path, ctx)
+    except BaseException:
+        if os.path.isfile(path):
+            os.remove(path)
+        raise
+    return {"file": os.path.basename(path), "filename": zipname}
+
+
+@INDEX_SECONDS.time()
+def update_img_db() -> list[str]:
+    """Add thumb to database, return added thumbs."""
     media_path = raspiconfig.media_path
+    added = []
     with Session(engine) as session:
         files = session.exec(select(Files.id)).all()
         for thumb in list_folder_files(media_path):
@@ -334,6 +458,18 @@ def update_img_db() -> None:
                 info = get_file_info(thumb)
                 file = Files(**info)
                 files.append(file.id)
+                added.append(thumb)
                 session.add(file)
                 session.commit()
                 write_log(f"Add {file.id} to database")
+    INDEXED_FILES.inc(len(added))
+    return added
+
+
+@jobs.handler("reindex")
+def reindex_img_db(ctx: JobContext) -> dict[str, int]:
+    """Rebuild thumbs database from media folder."""
+    with Session(engine) as session:
+        session.exec(delete(Files))
+        session.commit()
+    return {"added": len(update_img_db())}
@@ -0,0 +1,216 @@
+"""Background jobs."""
+
+from __future__ import annotations
+
+import glob
+import os
+import threading
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime as dt
+from typing import Any
+
+from sqlmodel import Session, col, delete, select
+
+from app.core.config import config
+from app.core.db import engine
+from app.core.log import write_log
+from app.models import Jobs
+
+FINISHED = ("success", "failed", "cancelled")
+
+
+class JobContext:
+    """Handle given to a job handler."""
+
+    def __init__(self, id: str, event: threading.Event) -> None:
+        """Initialize."""
+        self.id = id
+        self._event = event
+        self._progress = 0
+
+    @property
+    def cancelled(self) -> bool:
+        """Return True if cancel was requested."""
+        return self._event.is_set()
+
+    def check(self) -> None:
+        """Raise JobCancelled if cancel was requested."""
+        if self.cancelled:
+            raise JobCancelled(self.id)
+
+    def progress(self, done: int, total: int) -> None:
+        """Store progress, only when the percent changes."""
+        progress = min(done * 100 // total, 100) if total else 100
+        if progress != self._progress:
+            self._progress = progress
+            _update(self.id, progress=progress)
+
+
+class JobQueue:
+    """Persistent jobs run on one thread pool per job type.
+
+    The pool size of a type is its concurrency limit, from
+    `JOB_CONCURRENCY` (default 1).
+    """
+
+    def __init__(self, concurrency: dict[str, int], history: int) -> None:
+        """Initialize."""
+        self.concurrency = concurrency
+        self.history = history
+        self._handlers: dict[str, Callable[..., Any]] = {}
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self._futures: dict[str, Future] = {}
+        self._events: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def handler(self, type: str):
+        """Register a handler, called with a JobContext and job params."""
+
+        def decorator(func):
+            self._handlers[type] = func
+            return func
+
+        return decorator
+
+    def submit(self, type: str, **params: Any) -> Jobs:
+        """Store a pending job and queue it."""
+        if type not in self._handlers:
+            raise JobError(f"Unknown job type ({type})")
+
+        job = Jobs(id=uuid.uuid4().hex, type=type, params=params)
+        with Session(engine) as session:
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            self._prune(session)
+        self._dispatch(job.id, type, params)
+        return job
+
+    def get(self, id: str) -> Jobs | None:
+        """Return job."""
+        with Session(engine) as session:
+            return session.get(Jobs, id)
+
+    def get_all(self, type: str | None = None, state: str | None = None) -> list[Jobs]:
+        """Return jobs, newest first."""
+        query = select(Jobs).order_by(col(Jobs.created).desc())
+        if type:
+            query = query.where(Jobs.type == type)
+        if state:
+            query = query.where(Jobs.state == state)
+        with Session(engine) as session:
+            return session.exec(query).all()
+
+    def cancel(self, id: str) -> Jobs | None:
+        """Cancel a pending job, or ask a running one to stop."""
+        with self._lock:
+            future = self._futures.get(id)
+            event = self._events.get(id)
+        if event:
+            event.set()
+        if future and future.cancel():
+            _update(id, state="cancelled", ended=dt.now())
+        return self.get(id)
+
+    def recover(self) -> None:
+        """Requeue pending jobs, fail jobs interrupted by a restart."""
+        pending = []
+        with Session(engine) as session:
+            query = select(Jobs).where(col(Jobs.state).in_(["pending", "running"]))
+            for job in session.exec(query.order_by(Jobs.created)).all():
+                if job.state == "pending" and job.type in self._handlers:
+                    pending.append((job.id, job.type, job.params))
+                    continue
+                job.state = "failed"
+                job.error = "Interrupted"
+                job.ended = dt.now()
+                session.add(job)
+            session.commit()
+        for item in pending:
+            self._dispatch(*item)
+
+    def shutdown(self) -> None:
+        """Stop running jobs and drop queued ones."""
+        with self._lock:
+            for event in self._events.values():
+                event.set()
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self, id: str, type: str, params: dict) -> None:
+        with self._lock:
+            if (executor := self._executors.get(type)) is None:
+                executor = self._executors[type] = ThreadPoolExecutor(
+                    max(self.concurrency.get(type, 1), 1),
+                    thread_name_prefix=f"Job-{type}",
+                )
+            event = self._events[id] = threading.Event()
+            future = self._futures[id] = executor.submit(
+                self._run, id, type, params, event
+            )
+        future.add_done_callback(lambda _: self._forget(id))
+
+    def _forget(self, id: str) -> None:
+        with self._lock:
+            self._futures.pop(id, None)
+            self._events.pop(id, None)
+
+    def _run(self, id: str, type: str, params: dict, event: threading.Event) -> None:
+        if event.is_set():
+            _update(id, state="cancelled", ended=dt.now())
+            return
+
+        _update(id, state="running", started=dt.now())
+        try:
+            result = self._handlers[type](JobContext(id, event), **params)
+        except JobCancelled:
+            _update(id, state="cancelled", ended=dt.now())
+        except Exception as error:  # noqa: BLE001
+            write_log(f"[Job] {type} failed: {error}", "error")
+            _update(id, state="failed", error=str(error), ended=dt.now())
+        else:
+            _update(id, state="success", progress=100, result=result, ended=dt.now())
+
+    def _prune(self, session: Session) -> None:
+        """Keep the latest finished jobs only."""
+        ids = session.exec(
+            select(Jobs.id)
+            .where(col(Jobs.state).in_(FINISHED))
+            .order_by(col(Jobs.created).desc())
+            .offset(self.history)
+        ).all()
+        if ids:
+            session.exec(delete(Jobs).where(col(Jobs.id).in_(ids)))
+            session.commit()
+        for id in ids:
+            for path in glob.glob(export_path(id, "*")):
+                os.remove(path)
+
+
+def export_path(id: str, ext: str) -> str:
+    """Return path of a job result file, the export folder is created."""
+    os.makedirs(config.JOB_EXPORT_FOLDER, exist_ok=True)
+    return os.path.join(config.JOB_EXPORT_FOLDER, f"{id}.{ext}")
+
+
+def _update(id: str, **values: Any) -> None:
+    with Session(engine) as session:
+        if job := session.get(Jobs, id):
+            job.sqlmodel_update(values)
+            session.add(job)
+            session.commit()
+
+
+class JobCancelled(Exception):
+    """Raised in a handler when its job is cancelled."""
+
+
+class JobError(Exception):
+    """Error for JobQueue class."""
+
+
+jobs = JobQueue(config.JOB_CONCURRENCY, config.JOB_HISTORY)
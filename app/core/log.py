@@ -6,10 +6,14 @@ import os
 from datetime import datetime as dt
 from json.decoder import JSONDecodeError
 
+from app.core.logwriter import log_writer
 from app.core.raspiconfig import raspiconfig
 
 logger = logging.getLogger("uvicorn.error")
 
+DATETIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+READ_CHUNK = 65536
+
 
 def set_log_level(log_level: str) -> None:
     log_level = logging.getLevelName(log_level)
@@ -19,49 +23,157 @@ def set_log_level(log_level: str) -> None:
 
 def write_log(msg: str, level: str = "info") -> None:
     """Write log."""
-    log_file = raspiconfig.log_file
-    str_now = dt.now().strftime("%Y/%m/%d %H:%M:%S")
     getattr(logger, level)(msg)
-
-    mode = "w" if not os.path.isfile(log_file) else "a"
-    try:
-        with open(log_file, mode=mode, encoding="utf-8") as file:
-            line = json.dumps(
-                {"datetime": str_now, "level": level.upper(), "msg": msg},
-                separators=(",", ":"),
-            )
-            file.write(line + "\n")
-    except FileNotFoundError as error:
-        logger.error(error)
+    log_writer.write(raspiconfig.log_file, msg, level)
 
 
 def delete_log(log_size: int) -> None:
-    """Delete log."""
-    log_file = raspiconfig.log_file
-    if os.path.isfile(log_file):
-        log_lines = open(log_file, encoding="utf-8").readlines()
-        if len(log_lines) > log_size:
-            with open(log_file, mode="w", encoding="utf-8") as file:
-                file.writelines(log_lines[:log_size])
-                file.close()
-
-
-def get_logs(reverse: bool) -> list[str]:
-    """Get log."""
-    log_file = raspiconfig.log_file
+    """Trim log to log_size lines, dropping the oldest segments."""
+    log_writer.trim(raspiconfig.log_file, log_size)
+
+
+def clear_log() -> None:
+    """Clear log."""
+    log_writer.clear(raspiconfig.log_file)
+
+
+def get_log_files() -> list[str]:
+    """Return log segments, oldest first."""
+    log_writer.flush()
+    return log_writer.log_files(raspiconfig.log_file)[::-1]
+
+
+def read_logs(
+    limit: int,
+    before: str | None = None,
+    after: str | None = None,
+    level: str | None = None,
+    since: dt | None = None,
+    until: dt | None = None,
+    search: str | None = None,
+) -> tuple[list[dict], str | None, str | None]:
+    """Return newest matching entries first, with older and newer cursors.
+
+    Cursors are "<inode>:<offset>" byte positions in a log segment, they
+    survive rotation until the segment is dropped.
+    """
+    log_writer.flush()
+    segments = []
+    for path in log_writer.log_files(raspiconfig.log_file):
+        try:
+            segments.append((path, os.stat(path).st_ino))
+        except FileNotFoundError:
+            continue
+
+    since_str = since.strftime(DATETIME_FORMAT) if since else None
+    until_str = until.strftime(DATETIME_FORMAT) if until else None
+    search = search.lower() if search else None
+
+    def match(record: dict) -> bool:
+        return (
+            (level is None or record.get("level") == level)
+            and (since_str is None or record.get("datetime", "") >= since_str)
+            and (until_str is None or record.get("datetime", "") <= until_str)
+            and (search is None or search in str(record.get("msg", "")).lower())
+        )
+
     logs = []
-    if os.path.isfile(log_file):
-        with open(log_file, encoding="utf-8") as file:
-            lines = file.readlines()
-            file.close()
-
-        for line in lines:
-            line = line.replace("\n", "")
-            try:
-                line = json.loads(line)
-            except JSONDecodeError:
-                pass
-            logs.append(line)
-
-        logs.reverse()
-    return logs
+    if after is not None:
+        # Oldest first from cursor to the newest entry
+        ino, start = _parse_cursor(after)
+        if (index := _segment_index(segments, ino)) is None:
+            index, start = len(segments) - 1, 0
+        for idx in range(index, -1, -1):
+            path, ino = segments[idx]
+            for offset, line in _iter_forward(path, start if idx == index else 0):
+                after = f"{ino}:{offset + len(line) + 1}"
+                if (record := _parse_line(line)) and match(record):
+                    logs.append(record)
+                    if len(logs) >= limit:
+                        return logs[::-1], None, after
+        return logs[::-1], None, after
+
+    # Newest first from cursor, or from the end of the log
+    if segments:
+        path, ino = segments[0]
+        after = f"{ino}:{os.path.getsize(path)}"
+    index, end = 0, None
+    if before is not None:
+        ino, end = _parse_cursor(before)
+        if (index := _segment_index(segments, ino)) is None:
+            return logs, None, after
+
+    for idx in range(index, len(segments)):
+        path, ino = segments[idx]
+        for offset, line in _iter_backward(path, end if idx == index else None):
+            if not (record := _parse_line(line)):
+                continue
+            if since_str and record.get("datetime", "") < since_str:
+                return logs, None, after
+            if match(record):
+                logs.append(record)
+                if len(logs) >= limit:
+                    return logs, f"{ino}:{offset}", after
+    return logs, None, after
+
+
+def _parse_cursor(cursor: str) -> tuple[int, int]:
+    """Return inode and offset."""
+    ino, _, offset = cursor.partition(":")
+    return int(ino), int(offset)
+
+
+def _segment_index(segments: list[tuple[str, int]], ino: int) -> int | None:
+    for idx, (_, segment_ino) in enumerate(segments):
+        if segment_ino == ino:
+            return idx
+    return None
+
+
+def _parse_line(line: bytes) -> dict | None:
+    try:
+        record = json.loads(line)
+    except (JSONDecodeError, UnicodeDecodeError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _iter_forward(path: str, start: int = 0):
+    """Yield offset and complete lines from start."""
+    try:
+        with open(path, "rb") as file:
+            file.seek(start)
+            offset = start
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                yield offset, line[:-1]
+                offset += len(line)
+    except FileNotFoundError:
+        return
+
+
+def _iter_backward(path: str, end: int | None = None):
+    """Yield offset and lines from end to start, reading chunks backwards."""
+    try:
+        with open(path, "rb") as file:
+            pos = file.seek(0, os.SEEK_END) if end is None else end
+            buffer = b""
+            while pos > 0:
+                size = min(READ_CHUNK, pos)
+                pos -= size
+                file.seek(pos)
+                buffer = file.read(size) + buffer
+                buffer, *lines = buffer.split(b"\n")
+                offset = pos + len(buffer) + 1
+                records = []
+                for line in lines:
+                    records.append((offset, line))
+                    offset += len(line) + 1
+                for offset, line in reversed(records):
+                    if line:
+                        yield offset, line
+            if buffer:
+                yield 0, buffer
+    except FileNotFoundError:
+        return
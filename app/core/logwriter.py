@@ -0,0 +1,285 @@
+"""Buffered log writer."""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime as dt
+from functools import partial
+from typing import IO
+
+from app.core.config import config
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class LogWriter:
+    """Queue log lines and append them from a single thread.
+
+    The log is split in segments: the active file and rotated files
+    `<log_file>.1` (newest) to `<log_file>.<segments - 1>` (oldest).
+    Trimming drops whole segments.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        flush_interval: float,
+        batch_size: int,
+        max_bytes: int,
+        segments: int,
+    ) -> None:
+        """Initialize."""
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.max_lines = 0
+        self.segments = max(segments, 2)
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(max_size)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._file: IO[str] | None = None
+        self._path: str | None = None
+        self._lines = 0
+
+    @property
+    def segment_lines(self) -> int:
+        """Line budget of one segment, 0 is unbounded."""
+        return max(self.max_lines // self.segments, 1) if self.max_lines else 0
+
+    @property
+    def segment_bytes(self) -> int:
+        """Byte budget of one segment."""
+        return max(self.max_bytes // self.segments, 1)
+
+    def log_files(self, log_file: str) -> list[str]:
+        """Return existing segments, newest first."""
+        files = [log_file] + [f"{log_file}.{idx}" for idx in range(1, self.segments)]
+        return [file for file in files if os.path.isfile(file)]
+
+    def write(self, log_file: str, msg: str, level: str = "info") -> None:
+        """Queue a JSON log line, drop it if the queue is full."""
+        line = json.dumps(
+            {
+                "datetime": dt.now().strftime("%Y/%m/%d %H:%M:%S"),
+                "level": level.upper(),
+                "msg": msg,
+            },
+            separators=(",", ":"),
+        )
+        self._start()
+        try:
+            self._queue.put_nowait((log_file, level.upper(), line))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Wait until queued lines are written."""
+        self._command(lambda: None)
+
+    def trim(self, log_file: str, max_lines: int) -> None:
+        """Set line budget and rotate if the active segment is over it."""
+        self.max_lines = max_lines
+        self._command(partial(self._trim, log_file))
+
+    def clear(self, log_file: str) -> None:
+        """Remove all segments."""
+        self._command(partial(self._clear, log_file))
+
+    def close(self) -> None:
+        """Write pending lines and stop thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _command(self, command) -> None:
+        """Run command on writer thread after queued lines, and wait."""
+        self._start()
+        self._queue.put(command)
+        self._queue.join()
+
+    def _start(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="LogWriter", daemon=True
+                    )
+                    self._thread.start()
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while (
+                isinstance(batch[-1], tuple)
+                and len(batch) < self.batch_size
+                and (timeout := deadline - time.monotonic()) > 0
+            ):
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            # Only the last item of a batch may be a command
+            self._write_batch([item for item in batch if isinstance(item, tuple)])
+            if batch[-1] is None:
+                running = False
+            elif callable(batch[-1]):
+                try:
+                    batch[-1]()
+                except OSError as error:
+                    logger.error(error)
+            for _ in batch:
+                self._queue.task_done()
+
+        self._close_file()
+
+    def _write_batch(self, batch: list[tuple[str, str, str]]) -> None:
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            logger.warning(f"Log queue full, {dropped} lines dropped")
+
+        lines: dict[str, list[str]] = {}
+        for log_file, _, line in batch:
+            lines.setdefault(log_file, []).append(line + "\n")
+
+        for log_file, items in lines.items():
+            try:
+                while items:
+                    file = self._open(log_file)
+                    count = len(items)
+                    if self.segment_lines:
+                        count = max(self.segment_lines - self._lines, 1)
+                    file.writelines(items[:count])
+                    file.flush()
+                    self._lines += len(items[:count])
+                    items = items[count:]
+                    self._trim(log_file)
+            except OSError as error:
+                self._close_file()
+                logger.error(error)
+
+        if batch:
+            log_tail.publish([(level, line) for _, level, line in batch])
+
+    def _trim(self, log_file: str) -> None:
+        """Rotate the active segment if it is over budget."""
+        file = self._open(log_file)
+        if (self.segment_lines and self._lines >= self.segment_lines) or (
+            file.tell() >= self.segment_bytes
+        ):
+            self._rotate(log_file)
+
+    def _rotate(self, log_file: str) -> None:
+        """Shift segments, the oldest one is dropped."""
+        self._close_file()
+        for idx in range(self.segments - 1, 0, -1):
+            source = f"{log_file}.{idx - 1}" if idx > 1 else log_file
+            if os.path.exists(source):
+                os.replace(source, f"{log_file}.{idx}")
+
+    def _clear(self, log_file: str) -> None:
+        self._close_file()
+        for file in self.log_files(log_file):
+            os.remove(file)
+
+    def _open(self, log_file: str) -> IO[str]:
+        """Return kept-open handle, reopen if the file was replaced."""
+        if self._file is not None:
+            try:
+                same = self._path == log_file and os.path.samestat(
+                    os.fstat(self._file.fileno()), os.stat(log_file)
+                )
+            except OSError:
+                same = False
+            if same:
+                return self._file
+            self._close_file()
+
+        # Count lines once, the active segment is bounded
+        self._lines = 0
+        if os.path.isfile(log_file):
+            with open(log_file, "rb") as file:
+                for chunk in iter(partial(file.read, 65536), b""):
+                    self._lines += chunk.count(b"\n")
+        # Kept open across batches, closed by _close_file on rotation or exit
+        self._file = open(log_file, mode="a", encoding="utf-8")  # noqa: SIM115
+        self._path = log_file
+        return self._file
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._path = None
+
+
+class LogTail:
+    """Fan out written log lines to live viewers."""
+
+    def __init__(self, backlog: int, max_size: int) -> None:
+        """Initialize."""
+        self.backlog: deque[tuple[str, str]] = deque(maxlen=backlog)
+        self.max_size = max_size
+        self._subscribers: dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, lines: list[tuple[str, str]]) -> None:
+        """Publish level and JSON lines, called from the writer thread."""
+        with self._lock:
+            self.backlog.extend(lines)
+            loops = set(self._subscribers.values())
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._fanout, loop, lines)
+            except RuntimeError:
+                continue
+
+    def subscribe(self) -> tuple[list[tuple[str, str]], asyncio.Queue]:
+        """Return backlog and a queue of new lines, called from a loop."""
+        subscriber = asyncio.Queue(self.max_size)
+        with self._lock:
+            self._subscribers[subscriber] = asyncio.get_running_loop()
+            return list(self.backlog), subscriber
+
+    def unsubscribe(self, subscriber: asyncio.Queue) -> None:
+        """Stop receiving lines."""
+        with self._lock:
+            self._subscribers.pop(subscriber, None)
+
+    def _fanout(self, loop: asyncio.AbstractEventLoop, lines) -> None:
+        with self._lock:
+            subscribers = [
+                subscriber
+                for subscriber, item in self._subscribers.items()
+                if item is loop
+            ]
+        for subscriber in subscribers:
+            for line in lines:
+                try:
+                    subscriber.put_nowait(line)
+                except asyncio.QueueFull:
+                    # Slow viewer, drop lines rather than buffer
+                    break
+
+
+log_tail = LogTail(config.LOG_TAIL_BACKLOG, config.LOG_TAIL_QUEUE_SIZE)
+log_writer = LogWriter(
+    config.LOG_QUEUE_SIZE,
+    config.LOG_FLUSH_INTERVAL,
+    config.LOG_BATCH_SIZE,
+    config.LOG_MAX_BYTES,
+    config.LOG_SEGMENTS,
+)
+atexit.register(log_writer.close)
@@ -0,0 +1,222 @@
+"""In-process metrics, rendered in Prometheus text format."""
+
+from __future__ import annotations
+
+import functools
+import math
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from app.core.config import config
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Registry:
+    """Metrics collection, updates are no-ops while disabled."""
+
+    def __init__(self, enabled: bool) -> None:
+        """Initialize."""
+        self.enabled = enabled
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add metric."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Return all metrics in Prometheus text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class Metric:
+    """Metric values by label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        """Initialize and register."""
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def samples(self) -> list[str]:
+        """Return exposition lines."""
+        with self._lock:
+            return [
+                f"{self.name}{self._labels(labels)} {_format(value)}"
+                for labels, value in self._values.items()
+            ]
+
+    def _labels(self, values: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labelnames, values), *extra.items()]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter(Metric):
+    """Monotonic total."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, labels: tuple[str, ...] = ()) -> None:
+        """Increment."""
+        if not registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """Value going up and down."""
+
+    type = "gauge"
+
+    def set(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        """Set value."""
+        if not registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, amount: float = 1, labels: tuple[str, ...] = ()) -> None:
+        """Increment."""
+        if not registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, amount: float = 1, labels: tuple[str, ...] = ()) -> None:
+        """Decrement."""
+        self.inc(-amount, labels)
+
+
+class Histogram(Metric):
+    """Observations counted in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = BUCKETS,
+    ) -> None:
+        """Initialize and register."""
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, labels: tuple[str, ...] = ()) -> None:
+        """Add observation."""
+        if not registry.enabled:
+            return
+        with self._lock:
+            if (state := self._values.get(labels)) is None:
+                state = self._values[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, labels: tuple[str, ...] = ()) -> Callable:
+        """Decorate function to observe its duration."""
+
+        def decorator(function: Callable) -> Callable:
+            if not registry.enabled:
+                return function
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, labels)
+
+            return wrapper
+
+        return decorator
+
+    def samples(self) -> list[str]:
+        """Return exposition lines."""
+        lines = []
+        with self._lock:
+            for labels, (counts, total, count) in self._values.items():
+                for bound, bucket in zip(self.buckets, counts):
+                    le = self._labels(labels, le=_format(bound))
+                    lines.append(f"{self.name}_bucket{le} {bucket}")
+                le = self._labels(labels, le="+Inf")
+                lines.append(f"{self.name}_bucket{le} {count}")
+                lines.append(f"{self.name}_sum{self._labels(labels)} {_format(total)}")
+                lines.append(f"{self.name}_count{self._labels(labels)} {count}")
+        return lines
+
+
+def instrument_engine(db_engine: Engine) -> None:
+    """Observe query durations of engine, by statement type."""
+    if not registry.enabled:
+        return
+
+    # Start time lives on the execution context, failed statements leave
+    # nothing behind on the pooled connection
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    @event.listens_for(db_engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        if (start := getattr(context, "_query_start", None)) is None:
+            return
+        duration = time.perf_counter() - start
+        DB_QUERY_SECONDS.observe(duration, (statement.split(None, 1)[0].upper(),))
+
+
+def _format(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+registry = Registry(config.METRICS_ENABLED)
+
+RASPICONFIG_SEND_SECONDS = Histogram(
+    "viewpicam_raspiconfig_send_seconds", "Command sent to raspimjpeg FIFO"
+)
+RASPICONFIG_SEND_ERRORS = Counter(
+    "viewpicam_raspiconfig_send_errors_total", "Command not sent to FIFO"
+)
+SCHEDULER_TICK_SECONDS = Histogram(
+    "viewpicam_scheduler_tick_seconds", "Scheduler loop iteration, without poll sleep"
+)
+INDEX_SECONDS = Histogram("viewpicam_index_seconds", "Media folder indexing")
+INDEXED_FILES = Counter("viewpicam_indexed_files_total", "Files added to database")
+PURGE_STEP_SECONDS = Histogram("viewpicam_purge_step_seconds", "Purge step")
+PURGED_FILES = Counter("viewpicam_purged_files_total", "Files deleted by purge")
+MJPEG_CLIENTS = Gauge("viewpicam_mjpeg_clients", "Connected MJPEG stream clients")
+MJPEG_FRAMES = Counter("viewpicam_mjpeg_frames_total", "Frames sent to MJPEG clients")
+MJPEG_BYTES = Counter("viewpicam_mjpeg_bytes_total", "Bytes sent to MJPEG clients")
+HTTP_REQUEST_SECONDS = Histogram(
+    "viewpicam_http_request_seconds",
+    "Request handled until response start",
+    ("method", "route"),
+)
+DB_QUERY_SECONDS = Histogram(
+    "viewpicam_db_query_seconds", "Database statement execution", ("statement",)
+)
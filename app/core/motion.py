@@ -1,58 +1,108 @@
 """Motion functions."""
 
+from __future__ import annotations
+
+import asyncio
 import configparser
+import time
 
-from httpx import AsyncClient, HTTPError
+from httpx import AsyncClient, HTTPError, Limits, Timeout
 
 from app.core.config import config
 from app.core.process import get_pid
 
+_client: AsyncClient | None = None
+
 
 def is_motion():
-    return get_pid("*/motion") != 0
+    return get_pid("*/motion", pidfile=config.MOTION_PIDFILE) != 0
+
+
+def create_client() -> AsyncClient:
+    """Return a pooled client for the Motion webcontrol."""
+    return AsyncClient(
+        base_url=config.MOTION_URL,
+        timeout=Timeout(config.MOTION_TIMEOUT, connect=config.MOTION_CONNECT_TIMEOUT),
+        limits=Limits(
+            max_connections=config.MOTION_POOL_SIZE,
+            max_keepalive_connections=config.MOTION_POOL_SIZE,
+            keepalive_expiry=config.MOTION_KEEPALIVE,
+        ),
+    )
+
+
+async def async_open_client() -> None:
+    """Open the shared Motion client."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_client()
+
+
+async def async_close_client() -> None:
+    """Close the shared Motion client."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 async def async_get_motion() -> configparser.ConfigParser:
     """Get motion parameters."""
-    rsp_txt = await async_get(f"{config.MOTION_URL}/config/list")
+    return await motion_cache.async_get()
+
+
+async def async_list_motion() -> configparser.ConfigParser:
+    """Fetch motion parameters from Motion."""
+    rsp_txt = await async_get("config/list")
     return await async_parse_ini(rsp_txt)
 
 
 async def async_set_motion(key: str, value: str | bool | int | float) -> None:
     """set motion parameter."""
-    await async_get(f"{config.MOTION_URL}/config/set?{key}={value}")
+    await async_get("config/set", params={key: value})
+
+
+async def async_set_motions(values: dict[str, str | bool | int | float]) -> None:
+    """Set motion parameters concurrently."""
+    await asyncio.gather(
+        *(async_set_motion(key, value) for key, value in values.items())
+    )
 
 
 async def async_write_motion() -> None:
     """set motion parameter."""
-    await async_get(f"{config.MOTION_URL}/config/write")
+    await async_get("config/write")
 
 
 async def async_pause_motion() -> None:
     """set motion parameter."""
-    await async_get(f"{config.MOTION_URL}/config/pause")
+    await async_get("config/pause")
 
 
 async def async_start_motion() -> None:
     """set motion parameter."""
-    await async_get(f"{config.MOTION_URL}/config/start")
+    await async_get("config/start")
 
 
 async def async_restart_motion() -> configparser.ConfigParser:
     """set motion parameter."""
-    await async_get(f"{config.MOTION_URL}/config/restart")
-    rsp_text = await async_get(f"{config.MOTION_URL}/config/list")
-    return await async_parse_ini(rsp_text)
+    await async_get("config/restart")
+    motion_config = await async_list_motion()
+    motion_cache.update(motion_config)
+    return motion_config
 
 
-async def async_get(url: str) -> str:
+async def async_get(url: str, params: dict | None = None) -> str:
     """Get request."""
     try:
-        async with AsyncClient() as client:
-            response = await client.get(url)
+        if _client is not None and not _client.is_closed:
+            response = await _client.get(url, params=params)
+        else:
+            async with create_client() as client:
+                response = await client.get(url, params=params)
     except (ValueError, HTTPError) as error:
         raise MotionError(error) from error
-    return response.text()
+    return response.text
 
 
 async def async_parse_ini(raw_config: str) -> configparser.ConfigParser:
@@ -62,5 +112,51 @@ async def async_parse_ini(raw_config: str) -> configparser.ConfigParser:
     return config
 
 
+class MotionCache:
+    """Parsed snapshot of Motion parameters."""
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize."""
+        self.ttl = ttl
+        self._config: configparser.ConfigParser | None = None
+        self._expires = 0.0
+        self._generation = 0
+        self._task: asyncio.Task | None = None
+
+    async def async_get(self) -> configparser.ConfigParser:
+        """Return snapshot, concurrent readers share one fetch."""
+        if self._config is not None and time.monotonic() < self._expires:
+            return self._config
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._async_fetch())
+        return await asyncio.shield(self._task)
+
+    async def _async_fetch(self) -> configparser.ConfigParser:
+        generation = self._generation
+        try:
+            motion_config = await async_list_motion()
+            # Do not overwrite a snapshot written through during the fetch
+            if generation == self._generation:
+                self.update(motion_config)
+            return motion_config
+        finally:
+            self._task = None
+
+    def update(self, motion_config: configparser.ConfigParser) -> None:
+        """Write-through snapshot."""
+        self._generation += 1
+        self._config = motion_config
+        self._expires = time.monotonic() + self.ttl
+
+    def invalidate(self) -> None:
+        """Drop snapshot."""
+        self._generation += 1
+        self._config = None
+        self._expires = 0.0
+
+
 class MotionError(Exception):
     """Error for Motion config."""
+
+
+motion_cache = MotionCache(config.MOTION_CACHE_TTL)
@@ -3,26 +3,86 @@ from __future__ import annotations
 import asyncio
 import fnmatch
 import os
+import time
 from subprocess import PIPE, Popen
 
-from psutil import Process, ZombieProcess, process_iter
+from psutil import Error as PsutilError
+from psutil import Process, process_iter
 
+from app.core.config import config
 from app.exceptions import ViewPiCamException
 
+_pids: dict[tuple[str, ...], int] = {}
+_misses: dict[tuple[str, ...], float] = {}
 
-def get_pid(pid_type: str | list[str]) -> int:
-    """Return process id."""
+
+def get_pid(pid_type: str | list[str], pidfile: str | None = None) -> int:
+    """Return process id.
+
+    Lookup order: tracked or cached pid, pidfile, then process table scan.
+    """
     if not isinstance(pid_type, list):
         pid_type = [pid_type]
+    key = tuple(pid_type)
+
+    if (pid := _pids.get(key)) and is_pid_matching(pid, pid_type):
+        return pid
+    _pids.pop(key, None)
+
+    if pidfile and (pid := read_pidfile(pidfile)) and is_pid_matching(pid, pid_type):
+        register_pid(pid_type, pid)
+        return pid
+
+    if _misses.get(key, 0) > time.monotonic():
+        return 0
+
+    if pid := scan_pid(pid_type):
+        register_pid(pid_type, pid)
+    else:
+        _misses[key] = time.monotonic() + config.PID_CACHE_TTL
+    return pid
+
+
+def register_pid(pid_type: str | list[str], pid: int) -> None:
+    """Track process id, for children we spawn."""
+    key = tuple(pid_type) if isinstance(pid_type, list) else (pid_type,)
+    _pids[key] = pid
+    _misses.pop(key, None)
+
+
+def unregister_pid(pid_type: str | list[str]) -> None:
+    """Forget process id."""
+    key = tuple(pid_type) if isinstance(pid_type, list) else (pid_type,)
+    _pids.pop(key, None)
+
+
+def is_pid_matching(pid: int, pid_type: list[str]) -> bool:
+    """Return true if the process is alive and matches the patterns."""
+    try:
+        cmdline = Process(pid).cmdline()
+    except PsutilError:
+        return False
+    return bool(cmdline) and all(fnmatch.filter(cmdline, item) for item in pid_type)
+
+
+def read_pidfile(pidfile: str) -> int:
+    """Return process id from pidfile."""
+    try:
+        with open(pidfile, encoding="utf-8") as file:
+            return int(file.read().strip())
+    except (OSError, ValueError):
+        return 0
+
 
+def scan_pid(pid_type: list[str]) -> int:
+    """Return process id from the process table."""
     for proc in process_iter():
         try:
             cmdline = proc.cmdline()
-        except ZombieProcess:
-            cmdline = []
-        else:
-            if all(fnmatch.filter(cmdline, item) for item in pid_type):
-                return proc.pid
+        except PsutilError:
+            continue
+        if cmdline and all(fnmatch.filter(cmdline, item) for item in pid_type):
+            return proc.pid
     return 0
 
 
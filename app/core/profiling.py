@@ -0,0 +1,186 @@
+"""Request timings, event loop stalls and sampling profiler."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import config
+from app.core.metrics import HTTP_REQUEST_SECONDS
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class RouteTimings:
+    """Recent latencies by route, up to response start."""
+
+    def __init__(self, window: int) -> None:
+        """Initialize."""
+        self.window = window
+        self._timings: dict[tuple[str, str], deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, method: str, route: str, duration: float) -> None:
+        """Record a request duration."""
+        with self._lock:
+            if (timings := self._timings.get((method, route))) is None:
+                timings = self._timings[method, route] = deque(maxlen=self.window)
+            timings.append(duration)
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Return percentiles in ms by route, slowest p95 first."""
+        with self._lock:
+            items = [(key, list(values)) for key, values in self._timings.items()]
+        result = []
+        for (method, route), values in items:
+            cuts = (
+                statistics.quantiles(values, n=100, method="inclusive")
+                if len(values) > 1
+                else [values[0]] * 99
+            )
+            result.append(
+                {
+                    "method": method,
+                    "route": route,
+                    "count": len(values),
+                    "p50_ms": cuts[49] * 1000,
+                    "p95_ms": cuts[94] * 1000,
+                    "p99_ms": cuts[98] * 1000,
+                    "max_ms": max(values) * 1000,
+                }
+            )
+        return sorted(result, key=lambda item: item["p95_ms"], reverse=True)
+
+
+class TimingMiddleware:
+    """Time HTTP requests until response start, streams are not counted."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_timed(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                route = route_template(scope)
+                duration = time.perf_counter() - start
+                route_timings.add(scope["method"], route, duration)
+                HTTP_REQUEST_SECONDS.observe(duration, (scope["method"], route))
+            await send(message)
+
+        await self.app(scope, receive, send_timed)
+
+
+def route_template(scope: Scope) -> str:
+    """Return full path template of matched route, prefixes included."""
+    if (path_format := getattr(scope.get("route"), "path_format", None)) is None:
+        return "unmatched"
+    path = scope["path"]
+    try:
+        suffix = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    return (
+        path[: len(path) - len(suffix)] + path_format
+        if path.endswith(suffix)
+        else path_format
+    )
+
+
+class StallMonitor:
+    """Detect event loop stalls, the loop thread stack is captured.
+
+    A task on the loop updates a heartbeat, a thread checks it and
+    captures the stack of the loop thread once per stall.
+    """
+
+    def __init__(self, threshold: float, history: int) -> None:
+        """Initialize."""
+        self.threshold = threshold
+        self.stalls: deque[dict[str, Any]] = deque(maxlen=history)
+        self._beat = 0.0
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Start monitoring running loop."""
+        if self.threshold <= 0 or self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.ensure_future(self._heartbeat())
+        threading.Thread(target=self._watch, name="StallMonitor", daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop monitoring."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.threshold / 4)
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stop.wait(self.threshold / 4):
+            beat = self._beat
+            if beat == reported:
+                continue
+            if (stalled := time.monotonic() - beat) < self.threshold:
+                continue
+            reported = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            self.stalls.append(
+                {"time": time.time(), "stalled_ms": stalled * 1000, "stack": stack}
+            )
+            logger.warning(
+                f"Event loop stalled for {stalled * 1000:.0f} ms at\n{stack}"
+            )
+
+
+def sample_stacks(seconds: float, interval: float) -> str:
+    """Sample all threads, return collapsed stacks for flamegraph tools."""
+    own = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks: Counter[str] = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            calls = []
+            while frame is not None:
+                code = frame.f_code
+                calls.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            thread = names.get(ident, str(ident)).replace(" ", "_")
+            stacks[";".join([thread, *reversed(calls)])] += 1
+        time.sleep(interval)
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+route_timings = RouteTimings(config.REQUEST_TIMING_WINDOW)
+stall_monitor = StallMonitor(config.LOOP_STALL_THRESHOLD, config.LOOP_STALL_HISTORY)
@@ -0,0 +1,184 @@
+"""Purge service."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from collections.abc import Iterator
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, and_, or_, select
+
+from app.core.config import config
+from app.core.db import engine
+from app.core.filer import (
+    get_media_files,
+    list_folder_files,
+    remove_files,
+    scan_media_files,
+)
+from app.core.log import write_log
+from app.core.metrics import PURGE_STEP_SECONDS, PURGED_FILES
+from app.core.raspiconfig import raspiconfig
+from app.models import Files
+
+
+class Purge:
+    """Delete old media in bounded steps.
+
+    A run walks the files table oldest first and deletes in batches,
+    each `step` stops once its time budget is spent so the scheduler
+    loop keeps polling. Locked files are never purged.
+    """
+
+    def __init__(self, batch_size: int, time_budget: float) -> None:
+        """Initialize."""
+        self.batch_size = max(batch_size, 1)
+        self.time_budget = time_budget
+        self.count = 0
+        self._run: Iterator[None] | None = None
+
+    @property
+    def active(self) -> bool:
+        """Return True while a run is in progress."""
+        return self._run is not None
+
+    def start(
+        self,
+        video_hours: int,
+        image_hours: int,
+        lapse_hours: int,
+        space_level: int,
+        space_mode: int,
+    ) -> None:
+        """Start a run, a run in progress is kept."""
+        if self._run is None:
+            self.count = 0
+            self._run = self._purge(
+                video_hours, image_hours, lapse_hours, space_level, space_mode
+            )
+
+    @PURGE_STEP_SECONDS.time()
+    def step(self) -> None:
+        """Advance the run until time budget is spent."""
+        if self._run is None:
+            return
+        deadline = time.monotonic() + self.time_budget
+        try:
+            while time.monotonic() < deadline:
+                next(self._run)
+        except StopIteration:
+            self._run = None
+            PURGED_FILES.inc(self.count)
+            if self.count > 0:
+                write_log(f"Purged {self.count} files")
+        except (OSError, SQLAlchemyError) as error:
+            self._run = None
+            write_log(f"[Purge] {error}", "error")
+
+    def _purge(
+        self,
+        video_hours: int,
+        image_hours: int,
+        lapse_hours: int,
+        space_level: int,
+        space_mode: int,
+    ) -> Iterator[None]:
+        media_path = raspiconfig.media_path
+        now = dt.now()
+
+        if video_hours > 0:
+            self._purge_zips(media_path, now - td(hours=video_hours))
+            yield
+
+        unlocked = Files.locked == False
+        for type, hours in (("v", video_hours), ("i", image_hours), ("t", lapse_hours)):
+            if hours > 0:
+                query = select(Files).where(
+                    unlocked, Files.type == type, Files.datetime < now - td(hours=hours)
+                )
+                while self._delete_oldest(query)[0] == self.batch_size:
+                    yield
+                yield
+
+        if space_mode <= 0:
+            return
+
+        total, _, free = shutil.disk_usage(media_path)
+        match space_mode:
+            case 1 | 2:
+                level: float = min(max(space_level, 3), 97) * total / 100
+            case 3 | 4:
+                level = space_level * 1048576.0
+            case _:
+                return
+
+        match space_mode:
+            case 1 | 3:
+                # Free space below level
+                query = select(Files).where(unlocked)
+                while free < level:
+                    count, freed = self._delete_oldest(query, level - free)
+                    if count == 0:
+                        break
+                    free += freed
+                    yield
+            case 2 | 4:
+                # Media above level, keep newest files
+                if cutoff := self._keep_cutoff(level):
+                    query = select(Files).where(
+                        unlocked,
+                        or_(
+                            Files.datetime < cutoff[0],
+                            and_(Files.datetime == cutoff[0], Files.id <= cutoff[1]),
+                        ),
+                    )
+                    while self._delete_oldest(query)[0] == self.batch_size:
+                        yield
+
+    def _delete_oldest(self, query, needed: float | None = None) -> tuple[int, int]:
+        """Delete one batch of the oldest files, return count and freed bytes."""
+        count = freed = 0
+        with Session(engine) as session:
+            rows = session.exec(
+                query.order_by(Files.datetime, Files.id).limit(self.batch_size)
+            ).all()
+            # One folder scan for all lapses of the batch
+            scanfiles = scan_media_files() if any(r.type == "t" for r in rows) else None
+            for row in rows:
+                freed += remove_files(get_media_files(row.name, scanfiles))
+                session.delete(row)
+                count += 1
+                if needed is not None and freed >= needed:
+                    break
+            session.commit()
+        self.count += count
+        return count, freed
+
+    def _keep_cutoff(self, level: float) -> tuple[dt, str] | None:
+        """Return datetime and id of the newest file over level."""
+        kept = 0.0
+        with Session(engine) as session:
+            rows = session.exec(
+                select(Files.datetime, Files.id, Files.size).order_by(
+                    Files.datetime.desc(), Files.id.desc()
+                )
+            )
+            for datetime, id, size in rows:
+                kept += size * 1024
+                if kept > level:
+                    return datetime, id
+        return None
+
+    def _purge_zips(self, media_path: str, before: dt) -> None:
+        for file in list_folder_files(media_path, ["zip"]):
+            path = f"{media_path}/{file}"
+            if os.path.getmtime(path) < before.timestamp():
+                os.remove(path)
+                write_log("Purged orphan zip file")
+
+
+purge = Purge(config.PURGE_BATCH_SIZE, config.PURGE_TIME_BUDGET)
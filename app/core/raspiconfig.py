@@ -1,14 +1,16 @@
 """Class for raspimjpeg file."""
 
-import json
 import logging
 import os
+import threading
 import time
-from datetime import datetime as dt
 from subprocess import PIPE, Popen
 from typing import Any
 
 from app.core.config import config
+from app.core.logwriter import log_writer
+from app.core.metrics import RASPICONFIG_SEND_ERRORS, RASPICONFIG_SEND_SECONDS
+from app.core.process import register_pid
 from app.exceptions import ViewPiCamException
 
 logger = logging.getLogger("uvicorn.error")
@@ -24,7 +26,22 @@ class RaspiConfig:
         self.user_config = None
         self.raspi_config = None
         self.settings = None
-        self._load()
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name: str) -> Any:
+        """Load configuration file on first access to a setting.
+
+        Settings assigned before the first load are kept.
+        """
+        if name.startswith("_") or self.__dict__.get("raspi_config") is not None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            if self.raspi_config is None:
+                self._load(keep=set(self.__dict__))
+        return getattr(self, name)
 
     def refresh(self) -> None:
         """Reload configuration file."""
@@ -55,18 +72,22 @@ class RaspiConfig:
                 file.close()
         return config
 
-    def _load(self) -> None:
-        config_orig = self._get_file_config(self.path_file)
-        self.user_config = config_orig.get("user_config", "")
+    def _load(self, keep: set[str] | None = None) -> None:
+        with self._lock:
+            config_orig = self._get_file_config(self.path_file)
+            self.user_config = config_orig.get("user_config", "")
 
-        self.raspi_config = self._get_file_config(self.user_config, config_orig)
-        if not isinstance(self.raspi_config, dict):
-            raise RaspiConfigError("Raspi config, error loading")
+            raspi_config = self._get_file_config(self.user_config, config_orig)
+            if not isinstance(raspi_config, dict):
+                raise RaspiConfigError("Raspi config, error loading")
 
-        for key, value in self.raspi_config.items():
-            setattr(self, key, value)
+            for key, value in raspi_config.items():
+                if not keep or key not in keep:
+                    setattr(self, key, value)
+            # Set last, other threads treat it as the loaded flag
+            self.raspi_config = raspi_config
 
-        self._generate_folder()
+            self._generate_folder()
 
     def _generate_folder(self) -> None:
         """Create files & folders."""
@@ -112,10 +133,12 @@ class RaspiConfig:
                     logging.error("Error: touch status file")
 
             # Execute binary
-            Popen(self.bin)
+            process = Popen(self.bin)
+            register_pid(self.bin, process.pid)
         else:
             logging.error(f"Error: File not found ({self.bin})")
 
+    @RASPICONFIG_SEND_SECONDS.time()
     def send(self, cmd: str) -> None:
         """Send command to pipe."""
         try:
@@ -125,6 +148,7 @@ class RaspiConfig:
             self.write_log(f"Control - Send {cmd}")
         except Exception as error:  # pylint: disable=W0718
             self.write_log(f"[Raspiconfig] {error}", "error")
+            RASPICONFIG_SEND_ERRORS.inc()
             raise RaspiConfigError(error) from error
         finally:
             os.sync()
@@ -150,20 +174,8 @@ class RaspiConfig:
 
     def write_log(self, msg: str, level: str = "info") -> None:
         """Write log."""
-        log_file = self.log_file
-        str_now = dt.now().strftime("%Y/%m/%d %H:%M:%S")
         getattr(logger, level)(msg)
-
-        mode = "w" if not os.path.isfile(log_file) else "a"
-        try:
-            with open(log_file, mode=mode, encoding="utf-8") as file:
-                line = json.dumps(
-                    {"datetime": str_now, "level": level.upper(), "msg": msg},
-                    separators=(",", ":"),
-                )
-                file.write(line + "\n")
-        except FileNotFoundError as error:
-            logger.error(error)
+        log_writer.write(self.log_file, msg, level)
 
 
 class RaspiConfigError(Exception):
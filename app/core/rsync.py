@@ -1,23 +1,36 @@
 """Rsync service."""
 
+from __future__ import annotations
+
+import asyncio
 import logging
 import os
-from subprocess import PIPE, Popen
+import re
+import shlex
+import tempfile
+import threading
+import time
+import uuid
+from asyncio.subprocess import PIPE
+from datetime import datetime as dt
 
 from app.core.config import config
+from app.core.filer import data_file_name, get_file_type
 from app.core.log import write_log
-from app.core.process import get_pid
+from app.core.process import register_pid, unregister_pid
 from app.core.raspiconfig import raspiconfig
 from app.core.settings import read
+from app.models import RsyncJob
 
 logger = logging.getLogger("uvicorn.error")
 
+PROGRESS = re.compile(r"^\s*([\d.,]+\w?)\s+(\d+)%\s+(\S+)\s+(\d+:\d+:\d+)")
+
 
 class Rsync:
     def __init__(self) -> None:
         """Initialize."""
 
-        self.media_path = raspiconfig.media_path
         self.binary = config.RSYNC_BINARY
 
         self.options = None
@@ -26,8 +39,18 @@ class Rsync:
         self.user = None
         self.host = None
         self.direction = None
+        self.files_from = False
 
-    async def settings(self) -> None:
+        self.job: RsyncJob | None = None
+        self._pending = False
+        self._pending_files: set[str] | None = set()
+        self._batch_start: float | None = None
+        self._batch_files: set[str] | None = set()
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def settings(self) -> None:
         """Get setting from database."""
         data = read()
         self.options = data.get("rs_options", [])
@@ -36,55 +59,195 @@ class Rsync:
         self.user = data.get("rs_user")
         self.host = data.get("rs_remote_host")
         self.direction = data.get("rs_direction")
+        self.files_from = data.get("rs_files_from", False)
 
-    async def execute(self) -> bool:
-        """Rsync execute."""
+    def command(self, files_from: str | None = None) -> list[str]:
+        """Return rsync command line."""
+        options = self.options or []
+        if not isinstance(options, list):
+            options = [options]
 
-        write_log("Rsync support started")
+        if self.mode == "SSH":
+            ssh = ["-e", "ssh"]
+            shee = "/"
+        else:
+            ssh = []
+            shee = ":"
 
-        await self.settings()
+        return [
+            self.binary,
+            "-v",
+            *shlex.split(" ".join(options)),
+            "--no-perms",
+            "--no-inc-recursive",
+            "--info=progress2",
+            *([f"--files-from={files_from}"] if files_from else []),
+            "--exclude",
+            "*.th.jpg",
+            *ssh,
+            f"{raspiconfig.media_path}/",
+            f"{self.user}@{self.host}:{shee}{self.direction}",
+        ]
 
-        if not isinstance(self.options, list):
-            options = [self.options]
+    def schedule(self, thumbs: list[str]) -> None:
+        """Debounce capture events into one job (thread-safe)."""
+        self.settings()
+        files = None
+        if self.files_from:
+            if not thumbs:
+                return
+            # Lapse frames are not indexed, fall back to a full sync
+            if all(get_file_type(thumb) != "t" for thumb in thumbs):
+                files = [data_file_name(thumb) for thumb in thumbs]
 
-        options = " ".join(self.options)
+        now = time.monotonic()
+        with self._lock:
+            if self._batch_start is None:
+                self._batch_start = now
+            self._batch_files = _merge(self._batch_files, files)
+            deadline = min(
+                now + config.RSYNC_DEBOUNCE,
+                self._batch_start + config.RSYNC_MAX_LATENCY,
+            )
+        loop = self._get_loop()
+        loop.call_soon_threadsafe(self._arm, deadline)
 
-        if self.mode == "SSH":
-            ssh = "-e ssh"
-            shee = "/"
+    def _arm(self, deadline: float) -> None:
+        """Reset debounce timer, runs on rsync loop."""
+        if self._timer:
+            self._timer.cancel()
+        self._timer = self._loop.call_later(
+            max(deadline - time.monotonic(), 0), self._flush
+        )
+
+    def _flush(self) -> None:
+        """Trigger batched job, runs on rsync loop."""
+        with self._lock:
+            files, self._batch_files = self._batch_files, set()
+            self._batch_start = None
+            self._timer = None
+        self.trigger(files)
+
+    def trigger(self, files: set[str] | None = None) -> RsyncJob:
+        """Start a job, or coalesce with the running one (thread-safe).
+
+        Files are relative to media path, None for a full sync.
+        """
+        with self._lock:
+            if self.job and self.job.state in ("pending", "running"):
+                self._pending_files = _merge(
+                    self._pending_files if self._pending else set(), files
+                )
+                self._pending = True
+                self.job.queued = True
+                return self.job
+            job = self.job = RsyncJob(id=uuid.uuid4().hex, files=len(files or []))
+
+        asyncio.run_coroutine_threadsafe(self._async_run(job, files), self._get_loop())
+        return job
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the event loop dedicated to rsync jobs."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="Rsync", daemon=True
+                ).start()
+        return self._loop
+
+    async def _async_run(self, job: RsyncJob, files: set[str] | None) -> None:
+        """Run rsync and follow progress."""
+        try:
+            await self._async_transfer(job, files)
+        except Exception as error:  # noqa: BLE001
+            job.state = "failed"
+            write_log(f"[Rsync] {error}", "error")
+        finally:
+            job.ended = dt.now()
+            with self._lock:
+                again, self._pending = self._pending, False
+                files, self._pending_files = self._pending_files, set()
+            if again:
+                self.trigger(files)
+
+    async def _async_transfer(self, job: RsyncJob, files: set[str] | None) -> None:
+        write_log("Rsync support started")
+        self.settings()
+
+        if files:
+            with tempfile.NamedTemporaryFile(
+                "w", prefix="rsync_", suffix=".lst", delete=False
+            ) as file:
+                file.write("\n".join(sorted(files)) + "\n")
+            try:
+                await self._async_process(job, self.command(file.name))
+            finally:
+                os.remove(file.name)
         else:
-            ssh = ""
-            shee = ":"
+            await self._async_process(job, self.command())
+
+    async def _async_process(self, job: RsyncJob, cmd: list[str]) -> None:
+        logger.info(shlex.join(cmd))
 
-        cmd = f"{self.binary} -v {options} --no-perms --exclude '*.th.jpg' {ssh} {self.media_path}/ {self.user}@{self.host}:{shee}{self.direction}"
-        logger.info(cmd.strip())
-
-        if not get_pid("/usr/bin/rsync"):
-            process = Popen(
-                cmd,
-                shell=True,
-                stdout=PIPE,
-                stderr=PIPE,
-                text="utf-8",
-                env=dict(os.environ, RSYNC_PASSWORD=self.pwd),
+        env = dict(os.environ)
+        if self.pwd:
+            env["RSYNC_PASSWORD"] = self.pwd
+
+        job.state = "running"
+        job.started = dt.now()
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=PIPE, stderr=PIPE, env=env
+        )
+        register_pid(self.binary, process.pid)
+        try:
+            await asyncio.gather(
+                self._async_read(
+                    process.stdout, lambda line: self._progress(job, line)
+                ),
+                self._async_read(process.stderr, lambda line: write_log(line, "error")),
             )
+            job.return_code = await process.wait()
+        finally:
+            unregister_pid(self.binary)
+
+        if job.return_code > 0:
+            job.state = "failed"
+            write_log(f"Rsync failed ({job.return_code})", "error")
+            return
 
-            for stdout_line in iter(process.stdout.readline, ""):
-                logger.info(stdout_line.strip())
-            process.stdout.close()
+        job.state = "success"
+        job.progress = 100
+        write_log("Rsync successful")
 
-            for stderr_line in iter(process.stderr.readline, ""):
-                self.write_log(stderr_line, "error")
-            process.stderr.close()
+    @staticmethod
+    def _progress(job: RsyncJob, line: str) -> None:
+        """Update job from a progress2 line, log others."""
+        if match := PROGRESS.match(line):
+            job.transferred, progress, job.speed, job.eta = match.groups()
+            job.progress = int(progress)
+        else:
+            logger.info(line)
 
-            return_code = process.wait()
-            if return_code > 0:
-                self.write_log(f"Rsync failed ({return_code})", "error")
-                return False
+    @staticmethod
+    async def _async_read(stream: asyncio.StreamReader, callback) -> None:
+        """Read stream, progress2 lines are terminated by carriage returns."""
+        buffer = ""
+        while chunk := await stream.read(4096):
+            buffer += chunk.decode("utf-8", errors="replace")
+            *lines, buffer = re.split(r"[\r\n]", buffer)
+            for line in lines:
+                if line := line.strip():
+                    callback(line)
+        if line := buffer.strip():
+            callback(line)
 
-            self.write_log("Rsync successful")
 
-        return True
+def _merge(batch: set[str] | None, files: list[str] | set[str] | None):
+    """Merge files into batch, None is a full sync."""
+    if batch is None or files is None:
+        return None
+    return batch | set(files)
 
 
 class RsyncError(Exception):
@@ -2,32 +2,89 @@
 
 from __future__ import annotations
 
+import asyncio
+import hmac
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
 from datetime import timedelta, timezone
 from hashlib import scrypt
+from typing import Any
 
 import jwt
 
 from app.core.config import config
 
 ALGORITHM = "HS256"
+SCHEME = "scrypt"
+LEGACY_PARAMS = (16384, 8, 1)
 
+# Bounds CPU and memory used by concurrent logins
+_executor = ThreadPoolExecutor(
+    max_workers=config.PASSWORD_WORKERS, thread_name_prefix="password"
+)
+
+
+def hash_password(password: str) -> str:
+    """Hash password as scrypt$n$r$p$salt$hash, salt is per password."""
+    n, r, p = (
+        config.PASSWORD_SCRYPT_N,
+        config.PASSWORD_SCRYPT_R,
+        config.PASSWORD_SCRYPT_P,
+    )
+    salt = secrets.token_hex(16)
+    return f"{SCHEME}${n}${r}${p}${salt}${_scrypt(password, salt, n, r, p)}"
+
+
+def verify_password(password: str, known_hash: str) -> bool:
+    """Verify password, hex hashes salted with SECRET_KEY are still valid."""
+    try:
+        if known_hash.startswith(f"{SCHEME}$"):
+            _, n, r, p, salt, digest = known_hash.split("$")
+            n, r, p = int(n), int(r), int(p)
+        else:
+            n, r, p = LEGACY_PARAMS
+            salt, digest = config.SECRET_KEY, known_hash
+    except ValueError:
+        return False
+    return hmac.compare_digest(_scrypt(password, salt, n, r, p), digest)
 
-def hash_password(password):
-    return scrypt(
-        password.encode(), salt=config.SECRET_KEY.encode(), n=16384, r=8, p=1
-    ).hex()
+
+def needs_rehash(known_hash: str) -> bool:
+    """Return True if hash is legacy or made with other parameters."""
+    return not known_hash.startswith(
+        f"{SCHEME}${config.PASSWORD_SCRYPT_N}${config.PASSWORD_SCRYPT_R}"
+        f"${config.PASSWORD_SCRYPT_P}$"
+    )
 
 
-def verify_password(password, known_hash):
-    return (
-        scrypt(
-            password.encode(), salt=config.SECRET_KEY.encode(), n=16384, r=8, p=1
-        ).hex()
-        == known_hash
+async def async_hash_password(password: str) -> str:
+    """Hash password in the password executor."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, hash_password, password
     )
 
 
+async def async_verify_password(password: str, known_hash: str) -> bool:
+    """Verify password in the password executor."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, verify_password, password, known_hash
+    )
+
+
+def _scrypt(password: str, salt: str, n: int, r: int, p: int) -> str:
+    return scrypt(
+        password.encode(),
+        salt=salt.encode(),
+        n=n,
+        r=r,
+        p=p,
+        maxmem=128 * r * (n + p + 2) + 2**20,
+    ).hex()
+
+
 def create_access_token(sub, **kwargs) -> tuple[str, dt]:
     """Create JWToken."""
     dt_now = dt.now(tz=timezone.utc)
@@ -44,3 +101,62 @@ def create_access_token(sub, **kwargs) -> tuple[str, dt]:
         key=config.SECRET_KEY,
         algorithm=ALGORITHM,
     ), dt_lifetime
+
+
+class AuthCache:
+    """User auth state by id and by camera token, expired after ttl.
+
+    Entries are invalidated by User ORM update and delete events only, a
+    change made outside the ORM stays unseen for up to ttl seconds.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize."""
+        self.ttl = ttl
+        self._users: dict[int, tuple[float, dict[str, Any]]] = {}
+        self._tokens: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, id: int) -> dict[str, Any] | None:
+        """Return user state."""
+        with self._lock:
+            if (entry := self._users.get(id)) is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(id)
+                return None
+            return entry[1]
+
+    def get_token(self, token: str) -> dict[str, Any] | None:
+        """Return user state for a camera token."""
+        if (id := self._tokens.get(token)) is None:
+            return None
+        return self.get(id)
+
+    def put(self, user: dict[str, Any], token: str | None = None) -> None:
+        """Store user state, and the camera token it was found with."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._users[user["id"]] = (time.monotonic() + self.ttl, user)
+            if token:
+                self._tokens[token] = user["id"]
+
+    def invalidate(self, id: int) -> None:
+        """Drop user state, after user update or delete."""
+        with self._lock:
+            self._drop(id)
+
+    def clear(self) -> None:
+        """Drop all."""
+        with self._lock:
+            self._users.clear()
+            self._tokens.clear()
+
+    def _drop(self, id: int) -> None:
+        self._users.pop(id, None)
+        for token in [key for key, value in self._tokens.items() if value == id]:
+            del self._tokens[token]
+
+
+auth_cache = AuthCache(config.AUTH_CACHE_TTL)
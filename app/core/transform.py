@@ -1,9 +1,15 @@
 import os
+import shlex
 import shutil
+import tempfile
 from datetime import datetime as dt
+from datetime import timedelta as td
+from subprocess import DEVNULL, PIPE, Popen
+from typing import Any
 
 from fastapi import HTTPException
-from sqlmodel import Session, select
+from sqlalchemy import Select
+from sqlmodel import Session, and_, col, or_, select
 
 from app.core.config import config
 from app.core.db import engine
@@ -11,54 +17,140 @@ from app.core.filer import (
     data_file_name,
     find_lapse_files,
     get_file_index,
+    get_file_info,
     get_file_type,
 )
+from app.core.jobs import JobContext, jobs
 from app.core.log import write_log
-from app.core.process import execute_cmd
 from app.core.raspiconfig import raspiconfig
 from app.exceptions import ViewPiCamException
-from app.models import Files
+from app.models import FilePublic, Files
 
+# Converted video name differs from the lapse one, ids ignore extensions
+CONVERT_PREFIX = "cv_"
 
-def video_convert(filename: str) -> None:
+
+def video_convert(filename: str, ctx: JobContext | None = None) -> dict[str, Any]:
+    """Encode lapse frames to MP4, register the video once encoded.
+
+    Frames are streamed to the encoder stdin, the video is written to a
+    temporary file and renamed on success.
+    """
     media_path = raspiconfig.media_path
-    if check_media_path(filename):
-        file_type = get_file_type(filename)
-        file_index = get_file_index(filename)
-
-        if file_type == "t" and isinstance(int(file_index), int):
-            thumb_files = find_lapse_files(filename)
-            tmp = f"{media_path}/{file_type}{file_index}"
-            if not os.path.isdir(tmp):
-                os.makedirs(tmp, 0o744, True)
-
-            i = 0
-            for thumb in thumb_files:
-                os.symlink(thumb, f"{tmp}/i_{i:05d}.jpg")
-                i += 1
-
-            i = 0
-            video_file = f"{data_file_name(filename)[:-4]}.mp4"
-            cmd = config.CONVERT_CMD
-            ext = config.THUMBNAIL_EXT
-            rst = cmd.replace(f"i_{i:05d}", f"tmp/i_{i:05d}")
-            cmd = f"({rst} {media_path}/{video_file}; rm -rf {tmp};) >/dev/null 2>&1 &"
+    file_type = get_file_type(filename)
+    file_index = get_file_index(filename)
+    if not check_media_path(filename) or file_type != "t":
+        raise ViewPiCamException(f"Not a timelapse ({filename})")
+    if not (frames := find_lapse_files(filename)):
+        raise ViewPiCamException(f"No lapse frames ({filename})")
+
+    folder, name = os.path.split(data_file_name(filename))
+    video_file = os.path.join(folder, f"{CONVERT_PREFIX}{name[:-4]}.mp4")
+    output = f"{media_path}/{video_file}"
+    # Share the CPUs between concurrent conversions
+    threads = max((os.cpu_count() or 1) // jobs.concurrency.get("convert", 1), 1)
+    fps = getattr(raspiconfig, "mp4box_fps", 25)
+    cmd = [
+        "nice",
+        "-n",
+        str(config.CONVERT_NICE),
+        *shlex.split(config.CONVERT_CMD.format(fps=fps, threads=threads)),
+    ]
+    cmd.append(f"{output}.part")
+
+    write_log(f"Start lapse convert: {shlex.join(cmd)}")
+    with tempfile.TemporaryFile() as stderr:
+        process = Popen(
+            cmd,
+            bufsize=0,
+            stdin=PIPE,
+            stdout=DEVNULL,
+            stderr=stderr,
+        )
+        try:
             try:
-                write_log(f"Start lapse convert: {cmd}")
-                execute_cmd(cmd)
-                shutil.copy(
-                    src=f"{media_path}/{filename}",
-                    dst=f"{media_path}/{video_file}.v{file_index}{ext}",
-                )
-                write_log("Convert finished")
-            except ViewPiCamException as error:
-                write_log(f"[Convert] {str(error)}", "error")
+                for idx, frame in enumerate(frames):
+                    if ctx:
+                        ctx.check()
+                        ctx.progress(idx, len(frames) + 1)
+                    with open(frame, "rb") as file:
+                        shutil.copyfileobj(file, process.stdin)
+            except BrokenPipeError:
+                pass  # Encoder exited, its return code tells why
+            process.stdin.close()
+            return_code = process.wait()
+        except BaseException:
+            process.kill()
+            process.wait()
+            _remove(f"{output}.part")
+            raise
+        if return_code != 0:
+            _remove(f"{output}.part")
+            stderr.seek(0)
+            error = stderr.read().decode("utf-8", errors="replace").strip()
+            reason = error.splitlines()[-1] if error else ""
+            raise ViewPiCamException(f"Convert failed ({return_code}) {reason}")
+
+    os.replace(f"{output}.part", output)
+    thumb = f"{video_file.replace('/', raspiconfig.subdir_char)}.v{file_index}"
+    thumb += config.THUMBNAIL_EXT
+    shutil.copy(src=f"{media_path}/{filename}", dst=f"{media_path}/{thumb}")
+    with Session(engine) as session:
+        file = Files(**get_file_info(thumb))
+        session.merge(file)
+        session.commit()
+    write_log(f"Convert finished, add {file.id} to database")
+
+    return {"id": file.id, "video": video_file, "frames": len(frames)}
+
+
+@jobs.handler("convert")
+def convert_thumb(ctx: JobContext, filename: str) -> dict[str, Any]:
+    """Convert timelapse in background."""
+    return video_convert(filename, ctx)
+
+
+def _remove(path: str) -> None:
+    if os.path.isfile(path):
+        os.remove(path)
 
 
-def get_thumbs(sort_order: str, show_types: str, time_filter: int):
-    """Return thumbnails from database."""
+def get_thumbs(
+    sort_order: str,
+    show_types: str,
+    time_filter: int,
+    since: dt | None = None,
+    until: dt | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> tuple[list[FilePublic], str | None]:
+    """Return a page of thumbnails and the cursor of the next one.
 
-    order = Files.datetime.desc() if sort_order == "desc" else Files.datetime.asc()
+    Pages are keyed on (datetime, id), the cursor is the key of the
+    last row. Raise ValueError for a malformed cursor.
+    """
+    query = thumbs_query(
+        sort_order, show_types, time_filter, since, until, limit, cursor
+    )
+    with Session(engine) as session:
+        thumbs = [FilePublic(**row._mapping) for row in session.exec(query)]
+
+    next_cursor = None
+    if limit and len(thumbs) == limit:
+        next_cursor = f"{thumbs[-1].datetime.isoformat()},{thumbs[-1].id}"
+    return thumbs, next_cursor
+
+
+def thumbs_query(
+    sort_order: str,
+    show_types: str,
+    time_filter: int,
+    since: dt | None = None,
+    until: dt | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> Select:
+    """Return thumbnails select statement."""
     match show_types:
         case "both":
             show_types = ["i", "t", "v"]
@@ -67,34 +159,51 @@ def get_thumbs(sort_order: str, show_types: str, time_filter: int):
         case _:
             show_types = ["v"]
 
-    with Session(engine) as session:
-        if (time_filter := int(time_filter)) == 1:
-            files = session.exec(
-                select(Files).filter(Files.type.in_(show_types)).order_by(order)
-            )
-        elif time_filter == config.TIME_FILTER_MAX:
-            dt_search = dt.fromtimestamp(
-                dt.now().timestamp() - (86400 * (time_filter - 2))
-            )
-            files = session.exec(
-                select(Files)
-                .filter(Files.type.in_(show_types), Files.datetime <= dt_search)
-                .order_by(order)
+    # Files datetimes are naive local time
+    since, until = (
+        value.astimezone().replace(tzinfo=None) if value and value.tzinfo else value
+        for value in (since, until)
+    )
+
+    # Time filter N (2 to max - 1) is the day N - 1 days ago, max is older
+    now = dt.now()
+    before = None
+    if (time_filter := int(time_filter)) == config.TIME_FILTER_MAX:
+        before = now - td(days=time_filter - 2)
+    elif time_filter > 1:
+        since = max(since or dt.min, now - td(days=time_filter - 1))
+        until = min(until or now, now - td(days=time_filter - 2))
+
+    query = select(*[getattr(Files, field) for field in FilePublic.model_fields])
+    query = query.where(col(Files.type).in_(show_types))
+    if since:
+        query = query.where(Files.datetime >= since)
+    if until:
+        query = query.where(Files.datetime < until)
+    if before:
+        query = query.where(Files.datetime <= before)
+
+    desc = sort_order == "desc"
+    if cursor:
+        last, _, last_id = cursor.partition(",")
+        last = dt.fromisoformat(last)
+        if desc:
+            key = or_(
+                Files.datetime < last, and_(Files.datetime == last, Files.id < last_id)
             )
         else:
-            dt_lw = dt.fromtimestamp(dt.now().timestamp() - (86400 * (time_filter - 2)))
-            dt_gt = dt.fromtimestamp(dt.now().timestamp() - (time_filter - 1) * 86400)
-            files = session.exec(
-                select(Files)
-                .filter(
-                    Files.type.in_(show_types),
-                    Files.datetime < dt_lw,
-                    Files.datetime >= dt_gt,
-                )
-                .order_by(order)
+            key = or_(
+                Files.datetime > last, and_(Files.datetime == last, Files.id > last_id)
             )
+        query = query.where(key)
 
-        return files.all()
+    if desc:
+        query = query.order_by(col(Files.datetime).desc(), col(Files.id).desc())
+    else:
+        query = query.order_by(Files.datetime, Files.id)
+    if limit:
+        query = query.limit(limit)
+    return query
 
 
 def check_media_path(filename):
@@ -1,14 +1,27 @@
 """Utils functions."""
 
+from __future__ import annotations
+
 import logging
 import shutil
+import threading
+import zoneinfo
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING
 
+from app.core.config import config
 from app.core.log import write_log
 from app.core.process import execute_cmd
 from app.core.raspiconfig import raspiconfig
 
+if TYPE_CHECKING:
+    from timezonefinder import TimezoneFinder
+
 logger = logging.getLogger("uvicorn.error")
 
+_finder: TimezoneFinder | None = None
+_finder_lock = threading.Lock()
+
 
 def disk_usage() -> tuple[int, int, int, int, str]:
     """Disk usage."""
@@ -38,3 +51,40 @@ def set_timezone(timezone: str) -> None:
         execute_cmd(f"cp -f /usr/share/zoneinfo/{timezone} /etc/localtime")
     except Exception as error:
         logger.error(error)
+
+
+@cache
+def available_timezones() -> list[str]:
+    """Sorted timezone names."""
+    return sorted(zoneinfo.available_timezones())
+
+
+def get_timezone_finder() -> TimezoneFinder:
+    """Shared finder, its polygon data is loaded on first use."""
+    global _finder
+    with _finder_lock:
+        if _finder is None:
+            from timezonefinder import TimezoneFinder
+
+            _finder = TimezoneFinder()
+    return _finder
+
+
+def warmup_timezone_finder() -> None:
+    """Load finder in background."""
+    threading.Thread(
+        target=get_timezone_finder, name="timezonefinder", daemon=True
+    ).start()
+
+
+def timezone_at(latitude: float, longitude: float) -> str | None:
+    """Timezone name at coordinates, rounded to TIMEZONE_PRECISION decimals."""
+    return _timezone_at(
+        round(latitude, config.TIMEZONE_PRECISION),
+        round(longitude, config.TIMEZONE_PRECISION),
+    )
+
+
+@lru_cache(maxsize=config.TIMEZONE_CACHE_SIZE)
+def _timezone_at(latitude: float, longitude: float) -> str | None:
+    return get_timezone_finder().timezone_at(lng=longitude, lat=latitude)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import os
-import shutil
 import time
 from datetime import datetime as dt
 from typing import Any
@@ -12,15 +11,10 @@ from app.api.routes.schedule import dt_now, get_calendar
 from app.core.config import config
 from app.core.db import engine
 from app.core.fifo import open_pipe, read_pipe
-from app.core.filer import (
-    delete_mediafiles,
-    get_file_type,
-    get_sorted_files,
-    is_thumbnail,
-    list_folder_files,
-    update_img_db,
-)
+from app.core.filer import update_img_db
 from app.core.log import delete_log, write_log
+from app.core.metrics import SCHEDULER_TICK_SECONDS
+from app.core.purge import purge
 from app.core.raspiconfig import RaspiConfigError, raspiconfig
 from app.core.rsync import rsync
 from app.core.settings import read
@@ -61,8 +55,12 @@ def scheduler() -> None:
                 autocapture = 0
 
             last_status_time = os.path.getmtime(raspiconfig.status_file)
+            tick_start = None
             while timeout_max == 0 or timeout < timeout_max:
+                if tick_start is not None:
+                    SCHEDULER_TICK_SECONDS.observe(time.perf_counter() - tick_start)
                 time.sleep(poll_time)
+                tick_start = time.perf_counter()
                 cmd = read_pipe(motion_fifo_in)
                 if cmd == config.SCHEDULE_STOP and autocapture == 0:
                     if last_on_cmd:
@@ -106,9 +104,9 @@ def scheduler() -> None:
                     config.SCHEDULE_UPDATE_VID,
                     config.SCHEDULE_UPDATE_IMG,
                 ]:
-                    update_img_db()
+                    thumbs = update_img_db()
                     if data.get("rs_enabled"):
-                        rsync()
+                        rsync.schedule(thumbs)
                 elif cmd != "":
                     write_log(f"Ignore FIFO char {cmd}")
 
@@ -149,7 +147,7 @@ def scheduler() -> None:
                         write_log(
                             f"Scheduled tasks. Next at {time.ctime(managechecktime)}"
                         )
-                        purge_files(
+                        purge.start(
                             data["purgevideo_hours"],
                             data["purgeimage_hours"],
                             data["purgelapse_hours"],
@@ -161,6 +159,7 @@ def scheduler() -> None:
                             write_log(f"exec_macro: {cmd}")
                             send_cmds(str_cmd=f"sy {cmd}")
                         delete_log(int(raspiconfig.log_size))
+                    purge.step()
                     if autocapturetime > 0 and (timenow > autocapturetime):
                         autocapturetime = timenow + data["autocapture_interval"]
                         write_log("Autocapture request.")
@@ -184,73 +183,6 @@ def scheduler() -> None:
                                 last_status_time = timenow
 
 
-def purge_files(
-    sch_purgevideohours: int,
-    sch_purgeimagehours: int,
-    sch_purgelapsehours: int,
-    sch_purgespacelevel: int,
-    sch_purgespacemode: int,
-):
-    """Purge files."""
-    media_path = raspiconfig.media_path
-    purge_count = 0
-    if sch_purgevideohours > 0 or sch_purgeimagehours > 0 or sch_purgelapsehours > 0:
-        files = list_folder_files(media_path)
-        timenow = dt.timestamp(dt_now())
-        for file in files:
-            if file != "." and file != ".." and is_thumbnail(file):
-                f_type = get_file_type(file)
-                purge_hours = 0
-                match f_type:
-                    case "i":
-                        purge_hours = sch_purgeimagehours
-                    case "t":
-                        purge_hours = sch_purgelapsehours
-                    case "v":
-                        purge_hours = sch_purgevideohours
-                if purge_hours > 0:
-                    f_mod_hours: dt = os.path.getmtime(f"{media_path}/{file}")
-                    diff_hours: dt = dt.fromtimestamp(timenow - f_mod_hours).hour
-                    if f_mod_hours > 0 and diff_hours > purge_hours:
-                        os.remove(f"{media_path}/{file}")
-                        purge_count += 1
-            elif sch_purgevideohours > 0:
-                if ".zip" in file:
-                    f_mod_hours = os.path.getmtime(f"{media_path}/{file}")
-                    diff_hours: dt = dt.fromtimestamp(timenow - f_mod_hours).hour
-                    if f_mod_hours > 0 and diff_hours > sch_purgevideohours:
-                        os.remove(f"{media_path}/{file}")
-                        write_log("Purged orphan zip file")
-
-    if sch_purgespacemode > 0:
-        total, _, free = shutil.disk_usage(f"{media_path}")
-
-        match sch_purgespacemode:
-            case 1 | 2:
-                level: float = min(max(sch_purgespacelevel, 3), 97) * total / 100
-            case 3 | 4:
-                level = sch_purgespacelevel * 1048576.0
-
-        match sch_purgespacemode:
-            case 1 | 3:
-                if free < level:
-                    p_files = get_sorted_files(media_path, False)
-                    for p_file in p_files:
-                        if free < level:
-                            free += delete_mediafiles(p_file)
-                        purge_count += 1
-            case 2 | 4:
-                p_files = get_sorted_files(media_path, False)
-                for p_file in p_files:
-                    del_l = level <= 0
-                    level -= delete_mediafiles(p_file, del_l)
-                    if del_l:
-                        purge_count += 1
-
-    if purge_count > 0:
-        write_log("Purged purge_count Files")
-
-
 def send_cmds(str_cmd: str, days: dict[str, Any] | None = None) -> None:
     """Send multiple commands to FIFO."""
     if str_cmd and (is_day_active(days) or days is None):
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 import threading
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.routing import APIRoute
@@ -11,11 +12,15 @@ from fastapi.staticfiles import StaticFiles
 
 from app.api.main import api_router
 from app.core.config import config
+from app.core.db import async_dispose_engines
+from app.core.jobs import jobs
 from app.core.log import set_log_level
+from app.core.motion import async_close_client, async_open_client
 from app.core.process import get_pid
+from app.core.profiling import TimingMiddleware, stall_monitor
 from app.core.raspiconfig import raspiconfig
 from app.core.settings import read
-from app.core.utils import set_timezone
+from app.core.utils import set_timezone, warmup_timezone_finder
 from app.daemon.backgroundtask import main_start, watchdog_task
 
 logger = logging.getLogger("uvicorn.error")
@@ -33,7 +38,37 @@ def set_initial_config():
     set_timezone(config.GMT_OFFSET)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start Raspiconfig
+    if config.SVC_RASPIMJPEG and not get_pid(config.RASPI_BINARY):
+        raspiconfig.start()
+
+    # Start scheduler
+    if config.SVC_SCHEDULER:
+        main_start()
+
+    # Load initial configuration
+    set_initial_config()
+
+    # Watchdog scheduler
+    watchdog = threading.Thread(target=watchdog_task, name="Watchdog", daemon=True)
+    watchdog.start()
+
+    await async_open_client()
+    stall_monitor.start()
+    jobs.recover()
+    if config.TIMEZONE_WARMUP:
+        warmup_timezone_finder()
+    yield
+    stall_monitor.stop()
+    jobs.shutdown()
+    await async_close_client()
+    await async_dispose_engines()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title=config.SITE_NAME,
     debug=config.DEBUG,
     version=config.VERSION,
@@ -44,22 +79,8 @@ app = FastAPI(
     redoc_url="/api/v1/redoc",
 )
 
+app.add_middleware(TimingMiddleware)
 app.mount("/data", StaticFiles(directory="data"), name="data")
 
-# Start Raspiconfig
-if config.SVC_RASPIMJPEG and not get_pid(config.RASPI_BINARY):
-    raspiconfig.start()
-
-# Start scheduler
-if config.SVC_SCHEDULER:
-    main_start()
-
 # Load routes
 app.include_router(api_router, prefix=config.API_V1_STR)
-
-# Load initial configuration
-set_initial_config()
-
-# Watchdog scheduler
-watchdog = threading.Thread(target=watchdog_task, name="Watchdog", daemon=True)
-watchdog.start()
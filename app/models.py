@@ -2,11 +2,10 @@
 
 import uuid
 from datetime import datetime as dt
+from typing import Any
 
-import qrcode
-import qrcode.image.svg
 from pydantic import BaseModel, PrivateAttr, field_serializer
-from sqlmodel import JSON, Column, Field, Relationship, SQLModel
+from sqlmodel import JSON, Column, Field, Index, Relationship, SQLModel
 
 from app.core.config import Level, Locale, Type
 
@@ -75,6 +74,11 @@ class FileBase(SQLModel):
 
 class Files(FileBase, table=True):
     __tablename__ = "files"
+    __table_args__ = (
+        Index("ix_files_type_datetime", "type", "datetime", "id"),
+        Index("ix_files_datetime", "datetime", "id"),
+        Index("ix_files_locked", "locked"),
+    )
     id: str | None = Field(default=None, primary_key=True)
 
 
@@ -103,6 +107,28 @@ class FileUpdate(SQLModel):
     duration: int | None = Field(description="image numbers of timelapse", default=None)
 
 
+# -- Jobs --
+
+
+class Jobs(SQLModel, table=True):
+    __tablename__ = "jobs"
+    id: str = Field(primary_key=True)
+    type: str = Field(index=True, description="Handler name")
+    state: str = Field(
+        description="pending|running|success|failed|cancelled", default="pending"
+    )
+    progress: int = Field(description="Percent", default=0)
+    params: dict = Field(default_factory=dict, sa_column=Column(JSON))
+    result: Any = Field(default=None, sa_column=Column(JSON))
+    error: str | None = Field(default=None)
+    created: dt = Field(default_factory=dt.now)
+    started: dt | None = Field(default=None)
+    ended: dt | None = Field(default=None)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
 # -- Multiview --
 
 
@@ -148,8 +174,8 @@ class User(UserBase, table=True):
     alternative_id: int = Field(default=str(uuid.uuid4()))
     secret: str | None
     otp_secret: str | None = None
-    api_token: str | None = None
-    cam_token: str | None = None
+    api_token: str | None = Field(default=None, index=True)
+    cam_token: str | None = Field(default=None, index=True)
 
     roles: "Roles" = Relationship(back_populates="users")
 
@@ -377,6 +403,9 @@ class Otp(BaseModel):
         """Display QR Code."""
         if not obj:
             return
+        import qrcode
+        import qrcode.image.svg
+
         uri = f"otpauth://totp/viewpicam:{self.name}?secret={obj}&issuer=viewpicam"
         qr = qrcode.QRCode(image_factory=qrcode.image.svg.SvgPathImage)
         qr.make(fit=True)
@@ -393,6 +422,12 @@ class Register(Login):
     password_2: str
 
 
+class DeleteResult(BaseModel):
+    id: str
+    deleted: bool = Field(description="Files and row removed")
+    detail: str | None = Field(description="Reason when not deleted", default=None)
+
+
 class LockMode(BaseModel):
     mode: bool = Field(description="Locked is true")
     ids: list[str]
@@ -411,6 +446,23 @@ class Rsync(BaseModel):
     rs_mode: str = Field(default="Module")
     rs_remote_host: str | None = Field(default=None)
     rs_options: list[str] = Field(default=["-a", "-z"])
+    rs_files_from: bool = Field(
+        default=False, description="Sync only new captures with --files-from"
+    )
+
+
+class RsyncJob(BaseModel):
+    id: str = Field(description="Job id")
+    state: str = Field(description="pending|running|success|failed", default="pending")
+    progress: int = Field(description="Percent", default=0)
+    transferred: str = Field(description="Bytes transferred", default="0")
+    speed: str | None = Field(description="Transfer rate", default=None)
+    eta: str | None = Field(description="Remaining time", default=None)
+    started: dt | None = Field(description="Start time", default=None)
+    ended: dt | None = Field(description="End time", default=None)
+    return_code: int | None = Field(description="Exit status", default=None)
+    files: int = Field(description="Files listed, 0 for full sync", default=0)
+    queued: bool = Field(description="Another run is queued", default=False)
 
 
 class Schedule(BaseModel):
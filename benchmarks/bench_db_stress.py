@@ -0,0 +1,128 @@
+"""Stress SQLite with concurrent ingest and gallery reads.
+
+Writers insert files rows in small transactions like update_img_db,
+readers page the gallery like GET /previews. Runs once with SQLite
+defaults and once with the configured profile.
+
+Usage: python -m benchmarks.bench_db_stress [--writers 2] [--readers 4]
+       [--seconds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime as dt
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.core.db import create_db_engine, sqlite_pragmas
+from app.core.transform import thumbs_query
+from app.models import Files
+
+
+def writer(engine, prefix: str, stop: threading.Event, stats: dict) -> None:
+    idx = 0
+    while not stop.is_set():
+        idx += 1
+        name = f"{prefix}_{idx:07d}_{dt.now():%Y%m%d_%H%M%S}"
+        start = time.perf_counter()
+        try:
+            with Session(engine) as session:
+                session.add(
+                    Files(
+                        id=name.replace("_", ""),
+                        name=f"{name}.jpg.i0001.th.jpg",
+                        type="i",
+                        size=100,
+                        icon="bi-camera",
+                        datetime=dt.now(),
+                        realname=f"{name}.jpg",
+                        number="0001",
+                        lapse_count=0,
+                        duration=0,
+                    )
+                )
+                session.commit()
+            stats["write"].append(time.perf_counter() - start)
+        except OperationalError:
+            stats["errors"] += 1
+
+
+def reader(engine, stop: threading.Event, stats: dict) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with Session(engine) as session:
+                session.exec(thumbs_query("desc", "both", 1, limit=100)).all()
+            stats["read"].append(time.perf_counter() - start)
+        except OperationalError:
+            stats["errors"] += 1
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        return {"count": len(values)}
+    cuts = statistics.quantiles(values, n=100)
+    return {
+        "count": len(values),
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "max_ms": max(values) * 1000,
+    }
+
+
+def run(pragmas: dict, args) -> dict:
+    with tempfile.TemporaryDirectory() as folder:
+        engine = create_db_engine(
+            f"sqlite:///{os.path.join(folder, 'stress.db')}", pragmas
+        )
+        Files.__table__.create(engine)
+        stats = {"write": [], "read": [], "errors": 0}
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=writer, args=(engine, f"w{idx}", stop, stats))
+            for idx in range(args.writers)
+        ] + [
+            threading.Thread(target=reader, args=(engine, stop, stats))
+            for _ in range(args.readers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {
+        "pragmas": pragmas,
+        "writes": percentiles(stats["write"]),
+        "reads": percentiles(stats["read"]),
+        "locked_errors": stats["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    # Default profile keeps a short timeout to expose lock contention
+    results = {
+        "default": run({"busy_timeout": 100}, args),
+        "profile": run(sqlite_pragmas(), args),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
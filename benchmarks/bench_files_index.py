@@ -0,0 +1,127 @@
+"""Benchmark gallery queries with and without the files indexes.
+
+Builds a throwaway SQLite database, prints the query plan and timing of
+each time_filter branch before and after creating the indexes.
+
+Usage: python -m benchmarks.bench_files_index [--rows 100000] [--rounds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+from sqlalchemy import create_engine, insert, text
+
+from app.core.config import config
+from app.core.transform import thumbs_query
+from app.models import Files
+
+INDEXES = ("ix_files_type_datetime", "ix_files_datetime", "ix_files_locked")
+
+
+def populate(engine, rows: int) -> None:
+    Files.__table__.create(engine)
+    now = dt.now()
+    values = []
+    for idx in range(rows):
+        type = random.choice("iiitv")
+        taken = now - td(seconds=random.randint(0, 86400 * 30))
+        name = f"{type}{idx:07d}_{taken:%Y%m%d_%H%M%S}"
+        values.append(
+            {
+                "id": name.replace("_", ""),
+                "name": f"{name}.th.jpg",
+                "type": type,
+                "size": random.randint(100, 5000),
+                "icon": "bi-camera",
+                "datetime": taken,
+                "locked": random.random() < 0.01,
+                "realname": name,
+                "number": f"{idx:04d}",
+                "lapse_count": 0,
+                "duration": 0,
+            }
+        )
+    with engine.begin() as conn:
+        conn.execute(insert(Files.__table__), values)
+
+
+def cases() -> dict[str, object]:
+    queries = {}
+    for time_filter in (1, 2, 5, config.TIME_FILTER_MAX):
+        for show_types in ("both", "video"):
+            name = f"time_filter={time_filter},{show_types}"
+            queries[name] = thumbs_query("desc", show_types, time_filter)
+            queries[f"{name},limit=100"] = thumbs_query(
+                "desc", show_types, time_filter, limit=100
+            )
+    queries["purge_oldest_unlocked"] = (
+        Files.__table__.select()
+        .where(Files.locked == False)
+        .order_by(Files.datetime, Files.id)
+        .limit(100)
+    )
+    return queries
+
+
+def measure(engine, rounds: int) -> dict[str, dict]:
+    results = {}
+    with engine.connect() as conn:
+        for name, query in cases().items():
+            sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            start = time.perf_counter()
+            for _ in range(rounds):
+                count = len(conn.execute(text(sql)).all())
+            results[name] = {
+                "rows": count,
+                "ms": (time.perf_counter() - start) * 1000 / rounds,
+                "plan": plan,
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        engine = create_engine(f"sqlite:///{os.path.join(folder, 'bench.db')}")
+        populate(engine, args.rows)
+        with engine.begin() as conn:
+            for index in INDEXES:
+                conn.execute(text(f"DROP INDEX {index}"))
+        before = measure(engine, args.rounds)
+        with engine.begin() as conn:
+            for index in Files.__table__.indexes:
+                if index.name in INDEXES:
+                    index.create(conn)
+            conn.execute(text("ANALYZE files"))
+        after = measure(engine, args.rounds)
+        engine.dispose()
+
+    print(
+        json.dumps(
+            {
+                "rows": args.rows,
+                "queries": {
+                    name: {"before": before[name], "after": after[name]}
+                    for name in before
+                },
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
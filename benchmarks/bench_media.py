@@ -0,0 +1,252 @@
+"""Benchmark the media pipeline on synthetic capture trees.
+
+Generates raspimjpeg-style media folders (images, videos and timelapse
+batches, some of them in a subfolder flattened with subdir_char) of each
+size, then times update_img_db, get_thumbs, find_lapse_files, get_zip,
+delete_mediafiles and a purge run against a throwaway database. Trees
+are seeded so runs are comparable, results are JSON.
+
+Usage: python -m benchmarks.bench_media [--sizes 1000,10000,100000]
+       [--seed 1] [--samples 100] [--rounds 5] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+SUBDIR_CHAR = "@"
+DAYS = 30
+PURGE_HOURS = DAYS * 24 // 2
+LAPSE_FRAMES = 10
+
+
+def setup(folder: str) -> None:
+    """Point raspimjpeg config and database to folder, before app imports."""
+    raspi_config = os.path.join(folder, "raspimjpeg")
+    with open(raspi_config, "w", encoding="utf-8") as file:
+        file.write(
+            f"media_path {folder}/media\n"
+            f"preview_path {folder}/shm/cam.jpg\n"
+            f"status_file {folder}/shm/status_mjpeg.txt\n"
+            f"control_file {folder}/FIFO\n"
+            f"macros_path {folder}/macros\n"
+            f"boxing_path {folder}/h264\n"
+            f"log_file {folder}/scheduleLog.txt\n"
+            f"subdir_char {SUBDIR_CHAR}\n"
+        )
+    os.environ["RASPI_CONFIG"] = raspi_config
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{folder}/bench.db"
+
+
+def generate(media_path: str, size: int, rng: random.Random) -> dict[str, list[str]]:
+    """Create size captures, return thumb names by type."""
+    now = dt.now()
+    thumbs: dict[str, list[str]] = {"i": [], "v": [], "t": []}
+    payload = rng.randbytes(256)
+    for idx in range(1, size + 1):
+        taken = now - td(seconds=rng.randint(0, DAYS * 86400))
+        stamp = f"{taken:%Y%m%d_%H%M%S}"
+        number = f"{idx:04d}"
+        # One capture in ten is stored in a month subfolder
+        subdir = f"{taken:%Y%m}/" if rng.random() < 0.1 else ""
+        roll = rng.random()
+        if roll < 0.8:
+            type, names = "i", [f"{subdir}im_{number}_{stamp}.jpg"]
+        elif roll < 0.95:
+            type, names = "v", [f"{subdir}vi_{number}_{stamp}.mp4"]
+        else:
+            type = "t"
+            names = [
+                f"{subdir}tl_{number}_{frame:04d}_{stamp}.jpg"
+                for frame in range(1, LAPSE_FRAMES + 1)
+            ]
+        for offset, name in enumerate(names):
+            write(f"{media_path}/{name}", payload, taken.timestamp() + offset)
+        thumb = f"{names[0].replace('/', SUBDIR_CHAR)}.{type}{number}.th.jpg"
+        write(f"{media_path}/{thumb}", payload, taken.timestamp())
+        thumbs[type].append(thumb)
+    return thumbs
+
+
+def write(path: str, payload: bytes, mtime: float) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(payload)
+    os.utime(path, (mtime, mtime))
+
+
+def timed(func, rounds: int = 1) -> tuple[float, object]:
+    """Return median duration in ms and last result."""
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations), result
+
+
+def per_call(func, items: list) -> dict[str, float]:
+    durations = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        durations.append((time.perf_counter() - start) * 1000)
+    if not durations:
+        return {"count": 0}
+    return {
+        "count": len(durations),
+        "mean_ms": statistics.mean(durations),
+        "max_ms": max(durations),
+    }
+
+
+def run(folder: str, size: int, args) -> dict:
+    from io import BytesIO
+
+    from sqlmodel import Session, delete
+
+    from app.core.db import engine
+    from app.core.filer import (
+        delete_mediafiles,
+        find_lapse_files,
+        get_zip,
+        scan_media_files,
+        update_img_db,
+    )
+    from app.core.purge import purge
+    from app.core.raspiconfig import raspiconfig
+    from app.core.transform import get_thumbs
+    from app.models import Files
+
+    rng = random.Random(args.seed)
+    media_path = os.path.join(folder, f"media_{size}")
+    # Reload settings of the config file, then point to this tree
+    raspiconfig.refresh()
+    raspiconfig.media_path = media_path
+    with Session(engine) as session:
+        session.exec(delete(Files))
+        session.commit()
+
+    start = time.perf_counter()
+    thumbs = generate(media_path, size, rng)
+    results: dict = {
+        "captures": {type: len(names) for type, names in thumbs.items()},
+        "files": sum(len(files) for _, _, files in os.walk(media_path)),
+        "generate_ms": (time.perf_counter() - start) * 1000,
+    }
+
+    duration, added = timed(update_img_db)
+    results["update_img_db"] = {"ms": duration, "added": len(added)}
+    duration, _ = timed(update_img_db)
+    results["update_img_db_noop"] = {"ms": duration}
+
+    duration, (rows, cursor) = timed(lambda: get_thumbs("desc", "both", 1), args.rounds)
+    results["get_thumbs_all"] = {"ms": duration, "rows": len(rows)}
+    duration, (rows, cursor) = timed(
+        lambda: get_thumbs("desc", "both", 1, limit=100), args.rounds
+    )
+    results["get_thumbs_page"] = {"ms": duration, "rows": len(rows)}
+    duration, (rows, _) = timed(
+        lambda: get_thumbs("desc", "both", 1, limit=100, cursor=cursor), args.rounds
+    )
+    results["get_thumbs_next_page"] = {"ms": duration, "rows": len(rows)}
+
+    lapses = rng.sample(thumbs["t"], min(args.samples, len(thumbs["t"])))
+    results["find_lapse_files"] = per_call(find_lapse_files, lapses)
+    scanfiles = scan_media_files(media_path)
+    results["find_lapse_files_shared_scan"] = per_call(
+        lambda thumb: find_lapse_files(thumb, scanfiles), lapses
+    )
+
+    everything = [name for names in thumbs.values() for name in names]
+    zipped = rng.sample(everything, min(args.samples * 10, len(everything)))
+    duration, memory_file = timed(lambda: get_zip(zipped))
+    results["get_zip"] = {
+        "ms": duration,
+        "thumbs": len(zipped),
+        "bytes": len(memory_file.getbuffer())
+        if isinstance(memory_file, BytesIO)
+        else 0,
+    }
+
+    deleted = rng.sample(everything, min(args.samples, len(everything)))
+    results["delete_mediafiles"] = per_call(delete_mediafiles, deleted)
+
+    purge.start(PURGE_HOURS, PURGE_HOURS, PURGE_HOURS, 0, 0)
+    steps = 0
+    start = time.perf_counter()
+    while purge.active:
+        purge.step()
+        steps += 1
+    results["purge"] = {
+        "ms": (time.perf_counter() - start) * 1000,
+        "steps": steps,
+        "purged": purge.count,
+    }
+    return results
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        setup(folder)
+        from app.core.db import engine
+        from app.core.logwriter import log_writer
+        from app.models import Files
+
+        Files.__table__.create(engine)
+        results = {
+            "meta": {
+                "revision": git_revision(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "samples": args.samples,
+                "rounds": args.rounds,
+            },
+            "sizes": {
+                size: run(folder, int(size), args) for size in args.sizes.split(",")
+            },
+        }
+        log_writer.flush()
+        engine.dispose()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
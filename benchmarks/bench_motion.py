@@ -0,0 +1,78 @@
+"""Benchmark Motion webcontrol calls against a fake server.
+
+Usage: python -m benchmarks.bench_motion [--rounds 50] [--keys 20] [--latency 0.002]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+from httpx import AsyncClient
+
+from app.core import motion
+from app.core.config import config
+from benchmarks.motion_server import motion_server
+
+
+async def put_unpooled(values: dict[str, str]) -> None:
+    """Former behaviour: one client and one connection per call."""
+
+    async def get(url: str) -> str:
+        async with AsyncClient() as client:
+            return (await client.get(url)).text
+
+    for key, value in values.items():
+        await get(f"{config.MOTION_URL}config/set?{key}={value}")
+    await get(f"{config.MOTION_URL}config/write")
+    await get(f"{config.MOTION_URL}config/restart")
+    await get(f"{config.MOTION_URL}config/list")
+
+
+async def put_pooled(values: dict[str, str]) -> None:
+    """Shared client with concurrent config/set."""
+    await motion.async_set_motions(values)
+    await motion.async_write_motion()
+    await motion.async_restart_motion()
+
+
+async def run(rounds: int, keys: int) -> dict[str, float]:
+    values = {f"key_{idx}": str(idx) for idx in range(keys)}
+    results = {}
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await put_unpooled(values)
+    results["unpooled_ms"] = (time.perf_counter() - start) * 1000 / rounds
+
+    await motion.async_open_client()
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await put_pooled(values)
+        results["pooled_ms"] = (time.perf_counter() - start) * 1000 / rounds
+    finally:
+        await motion.async_close_client()
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--keys", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    with motion_server(latency=args.latency) as server:
+        config.MOTION_URL = server.url
+        results = asyncio.run(run(args.rounds, args.keys))
+        results["requests"] = server.requests
+
+    print(json.dumps({"rounds": args.rounds, "keys": args.keys, **results}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark process lookup on a host with many processes.
+
+Usage: python -m benchmarks.bench_process [--procs 2000] [--rounds 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import time
+
+from app.core import process
+
+
+def timed(func, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--procs", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    sleepers = [subprocess.Popen(["sleep", "600"]) for _ in range(args.procs)]
+    target = subprocess.Popen(["sleep", "601"])
+    pattern = ["sleep", "601"]
+    try:
+        results = {
+            "procs": args.procs,
+            "scan_ms": timed(lambda: process.scan_pid(pattern), args.rounds),
+            "miss_scan_ms": timed(
+                lambda: process.scan_pid(["*/not-running"]), args.rounds
+            ),
+        }
+        process.register_pid(pattern, target.pid)
+        results["tracked_ms"] = timed(lambda: process.get_pid(pattern), args.rounds)
+        process.get_pid("*/not-running")
+        results["cached_miss_ms"] = timed(
+            lambda: process.get_pid("*/not-running"), args.rounds
+        )
+    finally:
+        for proc in [*sleepers, target]:
+            proc.kill()
+            proc.wait()
+
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark cold import of app.main with -X importtime.
+
+Imports app.main in fresh interpreters, prints the median import time,
+the slowest modules and any deferred module imported at startup. Exits
+with status 1 when the median exceeds the budget or a deferred module
+is imported.
+
+Usage: python -m benchmarks.bench_startup [--runs 5] [--budget-ms 2000]
+       [--top 15]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Imported on first use only
+DEFERRED = ("qrcode", "timezonefinder", "suntime", "pytz")
+
+
+def import_times() -> dict[str, tuple[int, int]]:
+    """Self and cumulative import time in us, by module."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=2000)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    total_ms = statistics.median(times["app.main"][1] / 1000 for times in runs)
+    last = runs[-1]
+    slowest = sorted(last.items(), key=lambda item: item[1][0], reverse=True)
+    deferred = sorted(name for name in last if name in DEFERRED)
+
+    print(
+        json.dumps(
+            {
+                "runs": args.runs,
+                "import_ms": total_ms,
+                "budget_ms": args.budget_ms,
+                "slowest_self_ms": {
+                    name: self_us / 1000 for name, (self_us, _) in slowest[: args.top]
+                },
+                "deferred_imported": deferred,
+            },
+            indent=2,
+        )
+    )
+    if total_ms > args.budget_ms or deferred:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""Load test the preview and status endpoints against a fake raspimjpeg.
+
+Runs the app under uvicorn in a throwaway folder (database migrated with
+alembic, preview and status files on tmpfs), fed by the fake raspimjpeg
+process. For each endpoint and client count, clients run concurrently
+for the step duration while the server CPU and RSS are sampled:
+
+- cam_pic: request loop, latency is the request time.
+- cam_pic_new: MJPEG stream, latency is the age of received frames.
+- status: websocket, latency is the interval between messages.
+
+Client CPU is reported too, a saturated client process caps the curve.
+Everything runs on 127.0.0.1, no network access is needed.
+
+Usage: python -m benchmarks.bench_stream [--clients 1,5,10,25,50]
+       [--endpoints cam_pic,cam_pic_new,status] [--duration 10]
+       [--fps 10] [--frame-kb 40] [--delay 100] [--scheduler]
+       [--tmpfs /dev/shm] [--output results.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import httpx
+import psutil
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+
+from benchmarks.fake_raspimjpeg import ROOT, fake_raspimjpeg, frame_time
+
+FRAME_END = b"\xff\xd9\r\n"
+SAMPLE_INTERVAL = 0.5  # seconds between CPU and memory samples
+
+
+def setup(folder: str, shm: str) -> dict[str, str]:
+    """Write raspimjpeg config and database, return server environment."""
+    for name in ("config", "data", "h264", "log", "macros"):
+        os.makedirs(os.path.join(folder, name), exist_ok=True)
+    overrides = {
+        "base_path": folder,
+        "preview_path": f"{shm}/cam.jpg",
+        "status_file": f"{shm}/status_mjpeg",
+        "user_annotate": f"{shm}/user_annotate",
+        "control_file": f"{folder}/FIFO",
+        "motion_pipe": f"{folder}/FIFO1",
+        "media_path": f"{folder}/data",
+        "macros_path": f"{folder}/macros",
+        "boxing_path": f"{folder}/h264",
+        "user_config": f"{folder}/config/user_config",
+        "log_file": f"{folder}/log/schedule.log",
+        "motion_logfile": f"{folder}/log/motion.log",
+    }
+    lines = []
+    with open(os.path.join(ROOT, "raspimjpeg"), encoding="utf-8") as file:
+        for line in file:
+            key = line.split(" ", 1)[0]
+            lines.append(f"{key} {overrides[key]}\n" if key in overrides else line)
+    raspi_config = os.path.join(folder, "raspimjpeg")
+    with open(raspi_config, "w", encoding="utf-8") as file:
+        file.writelines(lines)
+
+    database_uri = f"sqlite:///{folder}/config/config.db"
+    migrate(database_uri)
+    return {
+        "RASPI_CONFIG": raspi_config,
+        "SQLALCHEMY_DATABASE_URI": database_uri,
+        "SVC_RASPIMJPEG": "false",
+    }
+
+
+def migrate(database_uri: str) -> None:
+    from alembic.config import Config
+
+    from alembic import command
+
+    alembic_config = Config(os.path.join(ROOT, "alembic.ini"))
+    alembic_config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    alembic_config.set_main_option("sqlalchemy.url", database_uri)
+    command.upgrade(alembic_config, "head")
+
+
+def add_user(database_uri: str) -> str:
+    """Create a viewer, return its camera token."""
+    from sqlmodel import Session, create_engine
+
+    from app.core.config import config
+    from app.models import User
+
+    cam_token = secrets.token_urlsafe(32)
+    db_engine = create_engine(database_uri)
+    with Session(db_engine) as session:
+        session.add(
+            User(
+                name="bench",
+                secret=None,
+                right=config.USERLEVEL_MINP,
+                cam_token=cam_token,
+            )
+        )
+        session.commit()
+    db_engine.dispose()
+    return cam_token
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def server(folder: str, env: dict[str, str], port: int, scheduler: bool):
+    """Run the app under uvicorn, yield its Popen once it answers."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=folder,
+        env={
+            **os.environ,
+            **env,
+            "SVC_SCHEDULER": str(scheduler).lower(),
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [ROOT, os.environ.get("PYTHONPATH")])
+            ),
+        },
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with {process.returncode}")
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/api/v1/openapi.json", timeout=1)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+async def cam_pic(client, base: str, params: dict, deadline: float, stats) -> None:
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        response = await client.get(f"{base}/cam/cam_pic", params=params)
+        if response.status_code != 200:
+            stats["errors"] += 1
+            continue
+        stats["latency"].append(time.perf_counter() - start)
+        stats["bytes"] += len(response.content)
+
+
+async def cam_pic_new(client, base: str, params: dict, deadline: float, stats):
+    async with client.stream("GET", f"{base}/cam/cam_pic_new", params=params) as rsp:
+        if rsp.status_code != 200:
+            stats["errors"] += 1
+            return
+        buffer = b""
+        async for chunk in rsp.aiter_bytes():
+            buffer += chunk
+            stats["bytes"] += len(chunk)
+            # Fake frames hold a single end of image marker
+            while (end := buffer.find(FRAME_END)) >= 0:
+                part, buffer = buffer[:end], buffer[end + len(FRAME_END) :]
+                if (written := frame_time(part.partition(b"\r\n\r\n")[2])) is not None:
+                    stats["latency"].append(time.time() - written)
+            if time.monotonic() >= deadline:
+                return
+
+
+async def status(client, base: str, params: dict, deadline: float, stats) -> None:
+    url = base.replace("http", "ws", 1) + "/ws/status"
+    async with connect(url) as websocket:
+        last = time.perf_counter()
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                message = await asyncio.wait_for(websocket.recv(), remaining)
+            except TimeoutError:
+                return
+            now = time.perf_counter()
+            stats["latency"].append(now - last)
+            stats["bytes"] += len(message)
+            last = now
+
+
+ENDPOINTS = {"cam_pic": cam_pic, "cam_pic_new": cam_pic_new, "status": status}
+
+
+async def client_task(endpoint, client, base, params, deadline, stats) -> None:
+    try:
+        await endpoint(client, base, params, deadline, stats)
+    except (httpx.HTTPError, OSError, WebSocketException):
+        stats["errors"] += 1
+
+
+async def sample(process: psutil.Process, samples: list, stop: asyncio.Event):
+    own = psutil.Process()
+    process.cpu_percent(None)
+    own.cpu_percent(None)
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+            return
+        except TimeoutError:
+            samples.append(
+                (
+                    process.cpu_percent(None),
+                    process.memory_info().rss,
+                    own.cpu_percent(None),
+                )
+            )
+
+
+async def step(name: str, clients: int, base: str, pid: int, args, token) -> dict:
+    """Run clients against endpoint for the step duration."""
+    stats = {"latency": [], "bytes": 0, "errors": 0}
+    params = {"cam_token": token, "delay": args.delay}
+    samples: list[tuple[float, int, float]] = []
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        sampler = asyncio.create_task(sample(psutil.Process(pid), samples, stop))
+        start = time.monotonic()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                client_task(ENDPOINTS[name], client, base, params, deadline, stats)
+                for _ in range(clients)
+            )
+        )
+        elapsed = time.monotonic() - start
+        stop.set()
+        await sampler
+
+    latency = stats["latency"]
+    return {
+        "clients": clients,
+        "count": len(latency),
+        "rate_per_s": len(latency) / elapsed,
+        "mb_per_s": stats["bytes"] / elapsed / 1e6,
+        "errors": stats["errors"],
+        "latency_ms": percentiles(latency),
+        "server_cpu_percent": summary([cpu for cpu, _, _ in samples]),
+        "server_rss_mb": summary([rss / 1e6 for _, rss, _ in samples]),
+        "client_cpu_percent": summary([cpu for _, _, cpu in samples]),
+    }
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    cuts = (
+        statistics.quantiles(values, n=100, method="inclusive")
+        if len(values) > 1
+        else [values[0]] * 99
+    )
+    return {
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(values) * 1000,
+    }
+
+
+def summary(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    return {"mean": statistics.mean(values), "max": max(values)}
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=ROOT,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", default="1,5,10,25,50")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--frame-kb", type=int, default=40)
+    parser.add_argument("--delay", type=int, default=100, help="ms, as the web UI")
+    parser.add_argument("--scheduler", action="store_true")
+    parser.add_argument("--tmpfs", default="/dev/shm")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    endpoints = args.endpoints.split(",")
+    if unknown := set(endpoints) - set(ENDPOINTS):
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    tmpfs = args.tmpfs if os.path.isdir(args.tmpfs) else None
+    results: dict = {
+        "meta": {
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "fps": args.fps,
+            "frame_kb": args.frame_kb,
+            "delay_ms": args.delay,
+            "duration_s": args.duration,
+            "scheduler": args.scheduler,
+            "tmpfs": tmpfs is not None,
+        },
+        "endpoints": {},
+    }
+    with (
+        tempfile.TemporaryDirectory() as folder,
+        tempfile.TemporaryDirectory(dir=tmpfs) as shm,
+    ):
+        env = setup(folder, shm)
+        token = add_user(env["SQLALCHEMY_DATABASE_URI"])
+        port = free_port()
+        base = f"http://127.0.0.1:{port}/api/v1"
+        with fake_raspimjpeg(env["RASPI_CONFIG"], args.fps, args.frame_kb):
+            deadline = time.monotonic() + 10
+            while not os.path.exists(f"{shm}/cam.jpg"):
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Fake raspimjpeg wrote no frame")
+                time.sleep(0.1)
+            with server(folder, env, port, args.scheduler) as process:
+                for name in endpoints:
+                    results["endpoints"][name] = [
+                        asyncio.run(
+                            step(name, int(clients), base, process.pid, args, token)
+                        )
+                        for clients in args.clients.split(",")
+                    ]
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
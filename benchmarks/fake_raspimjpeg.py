@@ -0,0 +1,162 @@
+"""Fake raspimjpeg process.
+
+Writes preview frames to preview_path at a fixed rate, keeps the status
+file up to date and consumes commands from the control FIFO, paths are
+read from a raspimjpeg configuration file. Each frame is a minimal JPEG
+whose comment segment holds the write time, so clients can measure the
+frame age.
+
+Usage: python -m benchmarks.fake_raspimjpeg CONFIG [--fps 10] [--frame-kb 40]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAMP = re.compile(rb"\xff\xfe..ts=(\d+\.\d+)", re.DOTALL)
+
+# Status written after a control command, by command and first parameter
+STATUS = {
+    ("ca", "1"): "video",
+    ("ca", "0"): "ready",
+    ("tl", "1"): "timelapse",
+    ("tl", "0"): "ready",
+    ("md", "1"): "md_ready",
+    ("md", "0"): "ready",
+    ("ru", "1"): "ready",
+    ("ru", "0"): "halted",
+}
+
+
+def read_config(path: str) -> dict[str, str]:
+    """Return raspimjpeg settings, as the app parses them."""
+    values = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("#") or not line.strip():
+                continue
+            key, _, value = line.rstrip("\n").partition(" ")
+            values[key] = value
+    return values
+
+
+def frame(size: int, number: int) -> bytes:
+    """Return JPEG markers around a stamped comment and padding."""
+    comment = f"ts={time.time():.6f} n={number}".encode()
+    padding = max(size - len(comment) - 10, 0)
+    return (
+        b"\xff\xd8\xff\xfe"
+        + (len(comment) + 2).to_bytes(2, "big")
+        + comment
+        + bytes(padding)
+        + b"\xff\xd9"
+    )
+
+
+def frame_time(data: bytes) -> float | None:
+    """Return write time of a fake frame."""
+    match = STAMP.search(data, 0, 64)
+    return float(match.group(1)) if match else None
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write through a temporary file, readers never see a partial frame."""
+    with open(f"{path}.part", "wb") as file:
+        file.write(data)
+    os.replace(f"{path}.part", path)
+
+
+def run(config_file: str, fps: float, frame_kb: int) -> None:
+    settings = read_config(config_file)
+    preview_path = settings["preview_path"]
+    status_file = settings["status_file"]
+    control_file = settings["control_file"]
+    for path in (preview_path, status_file, control_file):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not os.path.exists(control_file):
+        os.mkfifo(control_file, mode=0o600)
+
+    running = True
+
+    def stop(*_):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Keep a writer open, reads return EAGAIN instead of EOF between clients
+    fifo = os.open(control_file, os.O_RDONLY | os.O_NONBLOCK)
+    keep_open = os.open(control_file, os.O_WRONLY | os.O_NONBLOCK)
+    write_atomic(status_file, b"ready")
+    pending = b""
+    number = 0
+    interval = 1 / fps
+    next_frame = time.monotonic()
+    try:
+        while running:
+            number += 1
+            write_atomic(preview_path, frame(frame_kb * 1024, number))
+            try:
+                pending += os.read(fifo, 65536)
+            except BlockingIOError:
+                pass
+            *commands, pending = pending.split(b"\n")
+            for command in commands:
+                cmd, _, param = command.decode(errors="replace").strip().partition(" ")
+                if cmd == "im":
+                    write_atomic(status_file, b"image")
+                    status = "ready"
+                else:
+                    status = STATUS.get((cmd, param.split(" ")[0]))
+                if status:
+                    write_atomic(status_file, status.encode())
+            next_frame += interval
+            time.sleep(max(next_frame - time.monotonic(), 0))
+    finally:
+        os.close(keep_open)
+        os.close(fifo)
+
+
+@contextmanager
+def fake_raspimjpeg(config_file: str, fps: float = 10, frame_kb: int = 40):
+    """Run a fake raspimjpeg process, yield its Popen."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.fake_raspimjpeg",
+            config_file,
+            "--fps",
+            str(fps),
+            "--frame-kb",
+            str(frame_kb),
+        ],
+        cwd=ROOT,
+    )
+    try:
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("config")
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--frame-kb", type=int, default=40)
+    args = parser.parse_args()
+    run(args.config, args.fps, args.frame_kb)
+
+
+if __name__ == "__main__":
+    main()
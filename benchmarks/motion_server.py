@@ -0,0 +1,89 @@
+"""Fake Motion webcontrol server."""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_CONFIG = {
+    "threshold": "1500",
+    "noise_level": "32",
+    "despeckle_filter": "EedDl",
+    "minimum_motion_frames": "1",
+    "framerate": "15",
+    "event_gap": "60",
+}
+
+
+class MotionHandler(BaseHTTPRequestHandler):
+    """Answer the subset of Motion webcontrol used by the backend."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server: MotionServer = self.server
+        url = urlsplit(self.path)
+        action = url.path.rstrip("/").rsplit("/", 1)[-1]
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        with server.lock:
+            server.requests += 1
+            match action:
+                case "list":
+                    body = "[camera]\n" + "".join(
+                        f"{key} = {value}\n" for key, value in server.values.items()
+                    )
+                case "set":
+                    server.values.update(parse_qsl(url.query))
+                    body = "Done\n"
+                case "write" | "restart" | "pause" | "start":
+                    body = "Done\n"
+                case _:
+                    self.send_error(404)
+                    return
+
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MotionServer(ThreadingHTTPServer):
+    """Threaded server holding Motion parameters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0):
+        super().__init__(address, MotionHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.values = dict(DEFAULT_CONFIG)
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/0/"
+
+
+@contextmanager
+def motion_server(latency: float = 0):
+    """Run a fake Motion server on an ephemeral port."""
+    server = MotionServer(("127.0.0.1", 0), latency=latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()